@@ -0,0 +1,515 @@
+import csv
+import json
+import numpy as np
+
+from json_to_gource import convert_date_to_timestamp, leer_issues, ruta_entrada
+
+# --- CONFIGURACIÓN ---
+REPO_NAME = "flask"  # Nombre del repositorio
+LOG_EVENTOS = None   # Log Gource a analizar también, p.ej. f"{REPO_NAME}_merged.log" (None = ninguno)
+
+SEGUNDOS_POR_DIA = 86400
+
+# Campos de cada issue que usa el análisis (ver json_to_gource.CAMPOS_LOG)
+CAMPOS_ANALISIS = {
+    'id': None, 'user': None, 'start_time': None, 'end_time': None, 'state': None,
+    'labels': None, 'resolution_type': None, 'affected_files': None,
+    'related_commits': ['author', 'date'],
+}
+
+# Buckets para la actividad de autores: segundos fijos, o 'M' para meses naturales
+BUCKETS = {
+    'dia': SEGUNDOS_POR_DIA,
+    'semana': 7 * SEGUNDOS_POR_DIA,
+    'mes': 'M',
+}
+
+
+# ==========================================
+# CARGA: JSON / log Gource -> columnas NumPy
+# ==========================================
+def _codificar(valores):
+    """
+    Convierte una lista de strings en (vocabulario, códigos int32).
+    vocabulario[códigos[i]] == valores[i], en orden de primera aparición.
+    (Un dict es bastante más rápido que np.unique sobre arrays de objetos.)
+    """
+    indices = {}
+    codigos = np.fromiter((indices.setdefault(v, len(indices)) for v in valores),
+                          dtype=np.int32, count=len(valores))
+    vocab = np.empty(len(indices), dtype=object)
+    vocab[:] = list(indices)
+    return vocab, codigos
+
+
+def _fechas_a_timestamps(fechas):
+    """
+    Convierte fechas ISO 8601 a timestamps Unix (int64) de forma vectorizada.
+    Las fechas vacías quedan como -1.
+    """
+    n = len(fechas)
+    timestamps = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return timestamps
+
+    validas = np.fromiter(map(bool, fechas), dtype=bool, count=n)
+    presentes = [f for f in fechas if f]
+    # Caso común de la API de GitHub: 'YYYY-MM-DDTHH:MM:SSZ' (UTC)
+    if all(len(f) == 20 and f[-1] == 'Z' for f in presentes):
+        recortadas = np.array([f[:19] for f in presentes], dtype='datetime64[s]')
+        timestamps[validas] = recortadas.astype(np.int64)
+    else:
+        for i, f in enumerate(fechas):
+            ts = convert_date_to_timestamp(f) if f else None
+            if ts is not None:
+                timestamps[i] = ts
+    return timestamps
+
+
+def cargar_issues(repo_name=REPO_NAME, input_file=None):
+    """
+    Carga '{repo}_issues_commits.json' (o '.jsonl') en arrays columnares,
+    leyendo issue a issue con el lector de json_to_gource.
+
+    Columnas por issue (longitud n_issues):
+      id, start, end (-1 si sigue abierto), cerrado, autor, resolucion
+    Relaciones issue->N (formato "largo", una fila por par):
+      archivo_issue / archivo   (se ignoran los archivos ficticios discussions/)
+      label_issue / label
+      commit_issue / commit_autor / commit_ts
+    Los campos categóricos se guardan como códigos int32 + vocabulario.
+    """
+    if input_file is None:
+        input_file = ruta_entrada(repo_name)
+
+    try:
+        issues = leer_issues(input_file, CAMPOS_ANALISIS)
+    except FileNotFoundError:
+        print(f"❌ No se encontró '{input_file}'")
+        return None
+
+    ids, inicios, fines, estados, autores, resoluciones = [], [], [], [], [], []
+    archivo_issue, archivos = [], []
+    label_issue, labels = [], []
+    commit_issue, commit_autores, commit_fechas = [], [], []
+
+    for idx, issue in enumerate(issues):
+        ids.append(issue.get('id'))
+        inicios.append(issue.get('start_time') or '')
+        fines.append(issue.get('end_time') or '')
+        estados.append(issue.get('state', 'open'))
+        autores.append(issue.get('user', 'unknown'))
+        resoluciones.append(issue.get('resolution_type', 'manual'))
+
+        for file_path in issue.get('affected_files', []):
+            if not file_path.startswith('discussions/'):
+                archivo_issue.append(idx)
+                archivos.append(file_path)
+
+        for label in issue.get('labels', []):
+            label_issue.append(idx)
+            labels.append(label)
+
+        for commit in issue.get('related_commits', []):
+            commit_issue.append(idx)
+            commit_autores.append(commit.get('author') or issue.get('user', 'unknown'))
+            commit_fechas.append(commit.get('date') or '')
+
+    autores_vocab, autores_cod = _codificar(autores)
+    resol_vocab, resol_cod = _codificar(resoluciones)
+    archivos_vocab, archivos_cod = _codificar(archivos)
+    labels_vocab, labels_cod = _codificar(labels)
+    commit_autores_vocab, commit_autores_cod = _codificar(commit_autores)
+
+    datos = {
+        'n_issues': len(ids),
+        'id': np.array(ids, dtype=np.int64),
+        'start': _fechas_a_timestamps(inicios),
+        'end': _fechas_a_timestamps(fines),
+        'cerrado': np.array(estados, dtype=object) == 'closed',
+        'autor': autores_cod,
+        'autor_vocab': autores_vocab,
+        'resolucion': resol_cod,
+        'resolucion_vocab': resol_vocab,
+        'archivo_issue': np.array(archivo_issue, dtype=np.int64),
+        'archivo': archivos_cod,
+        'archivo_vocab': archivos_vocab,
+        'label_issue': np.array(label_issue, dtype=np.int64),
+        'label': labels_cod,
+        'label_vocab': labels_vocab,
+        'commit_issue': np.array(commit_issue, dtype=np.int64),
+        'commit_autor': commit_autores_cod,
+        'commit_autor_vocab': commit_autores_vocab,
+        'commit_ts': _fechas_a_timestamps(commit_fechas),
+    }
+
+    print(f"📊 Issues cargados: {datos['n_issues']} "
+          f"({len(archivos)} pares issue-archivo, {len(labels)} labels, {len(commit_fechas)} commits)")
+    return datos
+
+
+def cargar_eventos(log_file):
+    """
+    Carga un log Gource (timestamp|author|action|path[|color]) en columnas:
+      ts (int64), autor (códigos + vocab), accion (códigos + vocab), path (códigos + vocab)
+    Sirve para cualquiera de los logs generados por json_to_gource.py o el log de Git.
+    """
+    timestamps, autores, acciones, paths = [], [], [], []
+    try:
+        with open(log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip('\n').split('|')
+                if len(parts) >= 4:
+                    timestamps.append(parts[0])
+                    autores.append(parts[1])
+                    acciones.append(parts[2])
+                    paths.append(parts[3])
+    except FileNotFoundError:
+        print(f"❌ No se encontró '{log_file}'")
+        return None
+
+    autores_vocab, autores_cod = _codificar(autores)
+    acciones_vocab, acciones_cod = _codificar(acciones)
+    paths_vocab, paths_cod = _codificar(paths)
+
+    eventos = {
+        'n_eventos': len(timestamps),
+        'ts': np.array(timestamps, dtype=np.int64),
+        'autor': autores_cod,
+        'autor_vocab': autores_vocab,
+        'accion': acciones_cod,
+        'accion_vocab': acciones_vocab,
+        'path': paths_cod,
+        'path_vocab': paths_vocab,
+    }
+
+    print(f"📊 Eventos cargados: {eventos['n_eventos']} desde '{log_file}'")
+    return eventos
+
+
+# ==========================================
+# MÉTRICAS
+# ==========================================
+def issues_por_archivo(datos, top=None):
+    """
+    Número de issues relacionados con cada archivo, ordenado de mayor a menor.
+    Devuelve lista de (archivo, n_issues).
+    """
+    conteos = np.bincount(datos['archivo'], minlength=len(datos['archivo_vocab']))
+    orden = np.argsort(-conteos, kind='stable')
+    if top is not None:
+        orden = orden[:top]
+    return [(str(datos['archivo_vocab'][i]), int(conteos[i])) for i in orden]
+
+
+def tiempos_de_cierre(datos, bins=None):
+    """
+    Distribución del tiempo de cierre (en días) de los issues cerrados.
+    Devuelve percentiles, media e histograma.
+    """
+    mascara = datos['cerrado'] & (datos['start'] >= 0) & (datos['end'] >= 0)
+    dias = (datos['end'][mascara] - datos['start'][mascara]) / SEGUNDOS_POR_DIA
+
+    if dias.size == 0:
+        return {'n': 0, 'media': None, 'percentiles': {}, 'histograma': []}
+
+    if bins is None:
+        bins = [0, 1, 7, 30, 90, 365, max(float(dias.max()), 365) + 1]
+    conteos, bordes = np.histogram(dias, bins=bins)
+    percentiles = np.percentile(dias, [25, 50, 75, 90, 99])
+
+    return {
+        'n': int(dias.size),
+        'media': float(dias.mean()),
+        'percentiles': {f"p{p}": float(v) for p, v in zip([25, 50, 75, 90, 99], percentiles)},
+        'histograma': [
+            {'desde': float(bordes[i]), 'hasta': float(bordes[i + 1]), 'issues': int(conteos[i])}
+            for i in range(len(conteos))
+        ],
+    }
+
+
+def desglose_labels(datos):
+    """
+    Por cada label: total de issues, cerrados y mediana de días hasta el cierre.
+    """
+    n_labels = len(datos['label_vocab'])
+    if n_labels == 0:
+        return []
+
+    issue_idx = datos['label_issue']
+    cerrados_pares = datos['cerrado'][issue_idx]
+    totales = np.bincount(datos['label'], minlength=n_labels)
+    cerrados = np.bincount(datos['label'], weights=cerrados_pares, minlength=n_labels).astype(np.int64)
+
+    # Mediana por label: ordenar pares por (label, días) y tomar el centro de cada grupo
+    valido = cerrados_pares & (datos['start'][issue_idx] >= 0) & (datos['end'][issue_idx] >= 0)
+    dias = (datos['end'][issue_idx] - datos['start'][issue_idx])[valido] / SEGUNDOS_POR_DIA
+    labels_validos = datos['label'][valido]
+    orden = np.lexsort((dias, labels_validos))
+    dias, labels_validos = dias[orden], labels_validos[orden]
+    n_por_label = np.bincount(labels_validos, minlength=n_labels)
+    inicio_grupo = np.concatenate(([0], np.cumsum(n_por_label)[:-1]))
+
+    resultado = []
+    for i in np.argsort(-totales, kind='stable'):
+        n = n_por_label[i]
+        if n:
+            centro = inicio_grupo[i] + (n - 1) // 2
+            mediana = float((dias[centro] + dias[inicio_grupo[i] + n // 2]) / 2)
+        else:
+            mediana = None
+        resultado.append({
+            'label': str(datos['label_vocab'][i]),
+            'issues': int(totales[i]),
+            'cerrados': int(cerrados[i]),
+            'mediana_dias_cierre': mediana,
+        })
+    return resultado
+
+
+def _tam_bucket(bucket):
+    """Valida 'bucket' y devuelve su tamaño en segundos (o 'M' para meses naturales)."""
+    if isinstance(bucket, str):
+        if bucket not in BUCKETS:
+            raise ValueError(f"Bucket desconocido: {bucket!r}. Usa uno de {sorted(BUCKETS)} o un número de segundos.")
+        return BUCKETS[bucket]
+    if isinstance(bucket, bool) or not isinstance(bucket, (int, np.integer)) or bucket <= 0:
+        raise ValueError(f"Bucket no válido: {bucket!r}. Debe ser un número entero de segundos mayor que 0.")
+    return int(bucket)
+
+
+def _asignar_buckets(timestamps, tam):
+    """Índice de bucket de cada timestamp y timestamp de inicio de cada bucket."""
+    if tam == 'M':
+        # Meses naturales (UTC): datetime64[M] cuenta meses desde 1970-01
+        meses = timestamps.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+        origen = meses.min()
+        buckets = meses - origen
+        n_buckets = int(buckets.max()) + 1
+        inicios = (origen + np.arange(n_buckets)).astype('datetime64[M]').astype('datetime64[s]').astype(np.int64)
+        return buckets, inicios
+
+    origen = (timestamps.min() // tam) * tam
+    buckets = (timestamps - origen) // tam
+    n_buckets = int(buckets.max()) + 1
+    return buckets, origen + np.arange(n_buckets, dtype=np.int64) * tam
+
+
+def actividad_autores(timestamps, autores, autores_vocab, bucket='mes', top=None):
+    """
+    Matriz autores x buckets de tiempo con el número de eventos de cada autor.
+    bucket: 'dia', 'semana', 'mes' (mes natural, UTC) o un número de segundos.
+    Devuelve (autores, inicios_de_bucket, matriz).
+    """
+    tam = _tam_bucket(bucket)
+    validos = timestamps >= 0
+    timestamps, autores = timestamps[validos], autores[validos]
+    if timestamps.size == 0:
+        return [], [], np.zeros((0, 0), dtype=np.int64)
+
+    buckets, inicios = _asignar_buckets(timestamps, tam)
+    n_buckets = len(inicios)
+    n_autores = len(autores_vocab)
+
+    matriz = np.bincount(autores.astype(np.int64) * n_buckets + buckets,
+                         minlength=n_autores * n_buckets).reshape(n_autores, n_buckets)
+
+    filas = np.argsort(-matriz.sum(axis=1), kind='stable')
+    if top is not None:
+        filas = filas[:top]
+    return [str(autores_vocab[i]) for i in filas], inicios.tolist(), matriz[filas]
+
+
+def actividad_autores_issues(datos, bucket='mes', top=None):
+    """Actividad por autor combinando apertura de issues y commits relacionados."""
+    vocab, codigos = _codificar(
+        list(datos['autor_vocab'][datos['autor']]) + list(datos['commit_autor_vocab'][datos['commit_autor']])
+    )
+    timestamps = np.concatenate((datos['start'], datos['commit_ts']))
+    return actividad_autores(timestamps, codigos, vocab, bucket=bucket, top=top)
+
+
+def actividad_autores_eventos(eventos, bucket='mes', top=None):
+    """Actividad por autor sobre un log Gource cargado con cargar_eventos()."""
+    return actividad_autores(eventos['ts'], eventos['autor'], eventos['autor_vocab'], bucket=bucket, top=top)
+
+
+def conteo_eventos(eventos, columna, top=None):
+    """
+    Número de eventos por valor de 'columna' ('accion', 'path' o 'autor') de un log
+    cargado con cargar_eventos(), ordenado de mayor a menor. Devuelve lista de (valor, n).
+    """
+    vocab = eventos[f'{columna}_vocab']
+    conteos = np.bincount(eventos[columna], minlength=len(vocab))
+    orden = np.argsort(-conteos, kind='stable')
+    if top is not None:
+        orden = orden[:top]
+    return [(str(vocab[i]), int(conteos[i])) for i in orden]
+
+
+def matriz_cocambios(datos, top=50):
+    """
+    Matriz de co-cambio entre los 'top' archivos con más issues:
+    celda (i, j) = número de issues que afectan a la vez a los archivos i y j.
+    La diagonal es el número de issues de cada archivo.
+    Devuelve (archivos, matriz).
+    """
+    n_archivos = len(datos['archivo_vocab'])
+    if n_archivos == 0:
+        return [], np.zeros((0, 0), dtype=np.int64)
+
+    conteos = np.bincount(datos['archivo'], minlength=n_archivos)
+    seleccion = np.argsort(-conteos, kind='stable')[:top]
+
+    # Re-mapear archivos seleccionados a columnas 0..k-1 (-1 = fuera del top)
+    columna = np.full(n_archivos, -1, dtype=np.int64)
+    columna[seleccion] = np.arange(len(seleccion))
+    cols = columna[datos['archivo']]
+    dentro = cols >= 0
+
+    # Matriz de incidencia issues x archivos (sólo issues que tocan algún archivo del top)
+    issues_usados, filas = np.unique(datos['archivo_issue'][dentro], return_inverse=True)
+    incidencia = np.zeros((len(issues_usados), len(seleccion)), dtype=np.int64)
+    incidencia[filas, cols[dentro]] = 1
+
+    return [str(datos['archivo_vocab'][i]) for i in seleccion], incidencia.T @ incidencia
+
+
+# ==========================================
+# EXPORTACIÓN
+# ==========================================
+def exportar_csv(output_file, encabezados, filas):
+    """Escribe una tabla en CSV."""
+    with open(output_file, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(encabezados)
+        writer.writerows(filas)
+    print(f"✅ CSV generado: '{output_file}'")
+
+
+def exportar_matriz_csv(output_file, etiquetas_filas, etiquetas_columnas, matriz, esquina=""):
+    """Escribe una matriz etiquetada en CSV (primera columna = etiqueta de fila)."""
+    filas = [[etiqueta] + [int(v) for v in fila] for etiqueta, fila in zip(etiquetas_filas, matriz)]
+    exportar_csv(output_file, [esquina] + list(etiquetas_columnas), filas)
+
+
+def exportar_json(output_file, resultados):
+    """Escribe el resumen completo en JSON."""
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=4, ensure_ascii=False)
+    print(f"✅ JSON generado: '{output_file}'")
+
+
+def generar_analisis(repo_name=REPO_NAME, bucket='mes', top=50):
+    """
+    Calcula todas las métricas y las exporta:
+    - {repo}_analisis.json                 (resumen completo)
+    - {repo}_analisis_archivos.csv         (issues por archivo)
+    - {repo}_analisis_labels.csv           (desglose por label)
+    - {repo}_analisis_autores.csv          (actividad de autores por bucket)
+    - {repo}_analisis_cocambios.csv        (matriz de co-cambio)
+    """
+    _tam_bucket(bucket)  # Falla antes de cargar nada si el bucket no es válido
+    datos = cargar_issues(repo_name)
+    if datos is None:
+        return
+
+    archivos = issues_por_archivo(datos)
+    cierre = tiempos_de_cierre(datos)
+    labels = desglose_labels(datos)
+    autores, inicios, actividad = actividad_autores_issues(datos, bucket=bucket, top=top)
+    archivos_top, cocambios = matriz_cocambios(datos, top=top)
+
+    exportar_csv(f"{repo_name}_analisis_archivos.csv", ["archivo", "issues"], archivos)
+    exportar_csv(f"{repo_name}_analisis_labels.csv",
+                 ["label", "issues", "cerrados", "mediana_dias_cierre"],
+                 [[l['label'], l['issues'], l['cerrados'], l['mediana_dias_cierre']] for l in labels])
+    exportar_matriz_csv(f"{repo_name}_analisis_autores.csv", autores, inicios, actividad, esquina="autor")
+    exportar_matriz_csv(f"{repo_name}_analisis_cocambios.csv", archivos_top, archivos_top, cocambios,
+                        esquina="archivo")
+
+    resultados = {
+        'repo': repo_name,
+        'total_issues': datos['n_issues'],
+        'cerrados': int(datos['cerrado'].sum()),
+        'resoluciones': {
+            str(datos['resolucion_vocab'][i]): int(n)
+            for i, n in enumerate(np.bincount(datos['resolucion'], minlength=len(datos['resolucion_vocab'])))
+        },
+        'issues_por_archivo': [{'archivo': a, 'issues': n} for a, n in archivos[:top]],
+        'tiempo_de_cierre_dias': cierre,
+        'labels': labels,
+        'actividad_autores': {
+            'bucket': bucket,
+            'inicios': inicios,
+            'autores': {a: fila.tolist() for a, fila in zip(autores, actividad)},
+        },
+        'cocambios': {
+            'archivos': archivos_top,
+            'matriz': cocambios.tolist(),
+        },
+    }
+    exportar_json(f"{repo_name}_analisis.json", resultados)
+
+    print(f"   Issues cerrados: {resultados['cerrados']} / {resultados['total_issues']}")
+    if cierre['n']:
+        print(f"   Mediana de cierre: {cierre['percentiles']['p50']:.1f} días")
+    if archivos:
+        print(f"   Archivo con más issues: {archivos[0][0]} ({archivos[0][1]})")
+
+    return resultados
+
+
+def generar_analisis_eventos(log_file, repo_name=REPO_NAME, bucket='mes', top=50):
+    """
+    Calcula las métricas de un log Gource (ver cargar_eventos) y las exporta:
+    - {repo}_analisis_eventos.json           (resumen completo)
+    - {repo}_analisis_eventos_autores.csv    (actividad de autores por bucket)
+    - {repo}_analisis_eventos_acciones.csv   (eventos por acción: A/M/D)
+    - {repo}_analisis_eventos_paths.csv      (eventos por path)
+    """
+    _tam_bucket(bucket)  # Falla antes de cargar nada si el bucket no es válido
+    eventos = cargar_eventos(log_file)
+    if eventos is None:
+        return
+
+    autores, inicios, actividad = actividad_autores_eventos(eventos, bucket=bucket, top=top)
+    acciones = conteo_eventos(eventos, 'accion')
+    paths = conteo_eventos(eventos, 'path')
+
+    exportar_matriz_csv(f"{repo_name}_analisis_eventos_autores.csv", autores, inicios, actividad,
+                        esquina="autor")
+    exportar_csv(f"{repo_name}_analisis_eventos_acciones.csv", ["accion", "eventos"], acciones)
+    exportar_csv(f"{repo_name}_analisis_eventos_paths.csv", ["path", "eventos"], paths)
+
+    resultados = {
+        'repo': repo_name,
+        'log': log_file,
+        'total_eventos': eventos['n_eventos'],
+        'acciones': dict(acciones),
+        'eventos_por_path': [{'path': p, 'eventos': n} for p, n in paths[:top]],
+        'actividad_autores': {
+            'bucket': bucket,
+            'inicios': inicios,
+            'autores': {a: fila.tolist() for a, fila in zip(autores, actividad)},
+        },
+    }
+    exportar_json(f"{repo_name}_analisis_eventos.json", resultados)
+
+    print(f"   Eventos: {resultados['total_eventos']} de {len(eventos['autor_vocab'])} autores")
+    if paths:
+        print(f"   Path con más eventos: {paths[0][0]} ({paths[0][1]})")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ANÁLISIS DE ISSUES Y COMMITS")
+    print("=" * 60)
+
+    generar_analisis()
+    if LOG_EVENTOS:
+        print()
+        generar_analisis_eventos(LOG_EVENTOS)
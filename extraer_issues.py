@@ -1,29 +1,97 @@
-import requests
+import datetime
 import json
+import os
+import re
+import threading
 import time
-import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from pool_tokens import SIN_LIMITE, PoolTokens, cargar_tokens
 
 # --- CONFIGURACIÓN ---
 REPO_OWNER = "pallets"
 REPO_NAME = "flask"
 
-# Leer token desde archivo t.txt
-def cargar_token():
-    try:
-        with open("t.txt", "r", encoding="utf-8") as f:
-            return f.read().strip()
-    except FileNotFoundError:
-        print("❌ Error: No se encontró el archivo 't.txt' con el token de GitHub.")
-        print("   Crea un archivo 't.txt' con tu token de GitHub.")
-        sys.exit(1)
+# Modo de extracción:
+#   "completo"   -> todos los issues (get_issues)
+#   "candidatos" -> sólo issues cerrados con un PR enlazado formalmente, filtrados en el servidor
+#                   (get_issues_candidatos). Es un modo con pérdida: el log simple muestra todos los
+#                   issues (abiertos, cerrados a mano o por un commit directo) y los logs detallado y
+#                   unificado también los abiertos con PR y los que un PR sólo menciona; todos ésos
+#                   se pierden.
+MODO_EXTRACCION = "completo"
+FILTRO_LABELS = []      # p.ej. ["bug"]
+FILTRO_DESDE = None     # p.ej. "2023-01-01"
+FILTRO_HASTA = None
 
-GITHUB_TOKEN = cargar_token()
+# Enlace issue -> PR:
+#   "timeline" -> una llamada al timeline de cada issue (cross-referenced y commits que lo cierran)
+#   "indice"   -> índice inverso construido listando una vez todos los PRs cerrados
+#                 (construir_indice_prs); las llamadas crecen con el número de PRs, no de issues.
+#                 No detecta issues cerrados directamente por un commit sin PR.
+MODO_ENLACE = "timeline"
 
-HEADERS = {
-    'Authorization': f'token {GITHUB_TOKEN}',
-    'Accept': 'application/vnd.github.v3+json'
+# Salidas de json_to_gource.py que se quieren generar: "simple", "detallado", "unificado", "completo".
+# Sólo se descargan/guardan los campos que esas salidas usan (ver CAMPOS_POR_SALIDA);
+# los demás quedan en 'pending_fields' y se pueden traer después con completar_issues().
+SALIDAS = ["simple", "detallado", "unificado"]
+
+# Campos opcionales del enriquecimiento:
+#   pr_files        -> GET {pr}/files    (affected_files)
+#   pr_commits      -> GET {pr}/commits  (related_commits del PR)
+#   body            -> cuerpo del issue
+#   commit_messages -> mensajes de los commits
+CAMPOS_OPCIONALES = ["pr_files", "pr_commits", "body", "commit_messages"]
+CAMPOS_POR_SALIDA = {
+    "simple": {"pr_files", "pr_commits"},  # json_to_gource_log usa related_commits (+ affected_files si no hay commits)
+    "detallado": {"pr_files"},             # json_to_gource_detailed sólo usa affected_files
+    "unificado": {"pr_files"},             # merge_logs igual que el detallado
+    "completo": set(CAMPOS_OPCIONALES),    # registro con todos los datos
 }
 
+API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")  # Cambiable para probar contra una API local
+
+# Tokens desde t.txt (uno por línea); las peticiones se reparten entre ellos
+POOL = PoolTokens(cargar_tokens("t.txt"))
+
+# Issues procesados en paralelo en get_issue_list (por defecto, uno por token)
+HILOS = len(POOL.tokens)
+
+
+# Salida por hilo: los mensajes de cada issue se acumulan y se imprimen juntos
+_salida_hilo = threading.local()
+_lock_salida = threading.Lock()
+
+
+def mostrar(mensaje):
+    """Como print(), pero dentro de en_bloque() se acumula hasta el final del issue."""
+    lineas = getattr(_salida_hilo, "lineas", None)
+    if lineas is None:
+        print(mensaje)
+    else:
+        lineas.append(mensaje)
+
+
+def en_bloque(funcion, *args):
+    """Ejecuta funcion(*args) e imprime de una vez todo lo que haya mostrado."""
+    _salida_hilo.lineas = []
+    try:
+        return funcion(*args)
+    finally:
+        lineas, _salida_hilo.lineas = _salida_hilo.lineas, None
+        if lineas:
+            with _lock_salida:
+                print("\n".join(lineas), flush=True)
+
+
+def mostrar_cupos():
+    """Imprime el cupo restante de la API que queda en cada token del pool."""
+    print("   Cupo restante por token:")
+    for token, recursos in POOL.estado().items():
+        cupos = ", ".join(f"{recurso} {'sin límite' if restante == SIN_LIMITE else restante}"
+                          for recurso, restante in sorted(recursos.items()))
+        print(f"      {token}: {cupos or 'sin datos'}")
+
 
 # ==========================================
 # PASO 1: Obtener y guardar issues en JSON
@@ -42,8 +110,8 @@ def get_issues(repo_owner=REPO_OWNER, repo_name=REPO_NAME):
     while True:
         print(f"📄 Descargando página {pagina}...")
         try:
-            url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/issues"
-            resp = requests.get(url, headers=HEADERS, params=params)
+            url = f"{API_URL}/repos/{repo_owner}/{repo_name}/issues"
+            resp = POOL.get(url, params=params)
             
             if resp.status_code != 200:
                 print(f"Error: {resp.status_code} - {resp.reason}")
@@ -82,6 +150,121 @@ def get_issues(repo_owner=REPO_OWNER, repo_name=REPO_NAME):
     return issues_raw
 
 
+def construir_query_candidatos(repo_owner=REPO_OWNER, repo_name=REPO_NAME, etiquetas=None,
+                               desde=None, hasta=None, solo_cerrados=True, solo_con_pr=True):
+    """
+    Arma la query de la Search API para preseleccionar issues en el servidor.
+    - solo_cerrados: 'is:closed'
+    - solo_con_pr:   'linked:pr' (issues con un PR enlazado)
+    - etiquetas:     lista de labels (todas deben estar presentes)
+    - desde/hasta:   fechas 'YYYY-MM-DD' sobre la fecha de creación
+    """
+    partes = [f"repo:{repo_owner}/{repo_name}", "is:issue"]
+    if solo_cerrados:
+        partes.append("is:closed")
+    if solo_con_pr:
+        partes.append("linked:pr")
+    for etiqueta in etiquetas or []:
+        partes.append(f'label:"{etiqueta}"')
+    if desde and hasta:
+        partes.append(f"created:{desde}..{hasta}")
+    elif desde:
+        partes.append(f"created:>={desde}")
+    elif hasta:
+        partes.append(f"created:<={hasta}")
+    return " ".join(partes)
+
+
+def get_issues_candidatos(repo_owner=REPO_OWNER, repo_name=REPO_NAME, etiquetas=None,
+                          desde=None, hasta=None, solo_cerrados=True, solo_con_pr=True, limite=100):
+    """
+    Igual que get_issues(), pero filtrando en el servidor con la Search API
+    (cerrados, enlazados a un PR, labels, fechas) para que get_issue_list()
+    enriquezca muchos menos issues.
+
+    Es un modo con pérdida respecto a get_issues():
+    - El log simple muestra todos los issues; aquí faltan los abiertos, los
+      cerrados a mano y los cerrados por un commit directo sin PR.
+    - Los logs detallado y unificado muestran todo issue 'PR_linked', y eso
+      incluye issues abiertos (descartados por 'is:closed'; usar
+      solo_cerrados=False para conservarlos) y los que un PR sólo menciona
+      (evento 'cross-referenced'), que 'linked:pr' no encuentra porque sólo
+      cubre PRs enlazados formalmente (palabras de cierre o el panel "Development").
+    Esos issues no aparecerán en los logs.
+
+    La Search API devuelve como máximo 1000 resultados por query: se ordena por
+    fecha de creación ascendente y, al llegar al tope, se relanza la query
+    desde la última fecha vista.
+    Guarda el resultado en el mismo '{repo}_issues.json'.
+    """
+    query = construir_query_candidatos(repo_owner, repo_name, etiquetas, desde, hasta,
+                                       solo_cerrados, solo_con_pr)
+    issues_raw = []
+    vistos = set()
+    url = f"{API_URL}/search/issues"
+
+    print(f"--- 🔎 Buscando issues candidatos de {repo_owner}/{repo_name} ---")
+    print(f"   Query: {query}")
+
+    while True:
+        nuevos_en_query = 0
+        ultima_fecha = None
+
+        for pagina in range(1, 11):  # 10 páginas x 100 = tope de 1000 de la Search API
+            print(f"📄 Descargando página {pagina}...")
+            params = {"q": query, "per_page": 100, "page": pagina, "sort": "created", "order": "asc"}
+            try:
+                resp = POOL.get(url, params=params)
+                if resp.status_code != 200:
+                    print(f"Error: {resp.status_code} - {resp.reason}")
+                    break
+
+                datos = resp.json()
+                items = datos.get("items", [])
+                if pagina == 1:
+                    print(f"   Total según la búsqueda: {datos.get('total_count', 0)}")
+                if not items:
+                    break
+
+                for item in items:
+                    ultima_fecha = item["created_at"]
+                    if item["number"] not in vistos and "pull_request" not in item:
+                        vistos.add(item["number"])
+                        issues_raw.append(item)
+                        nuevos_en_query += 1
+
+                print(f"   Issues candidatos en esta página: {len(items)}")
+                time.sleep(2)  # La Search API tiene un límite por minuto más estricto
+
+                if len(items) < 100:
+                    break
+            except Exception as e:
+                print(f"Error: {e}")
+                break
+
+            if limite is not None and len(issues_raw) >= limite:
+                break
+        else:
+            # Se agotaron las 10 páginas: continuar desde la última fecha de creación
+            if ultima_fecha and nuevos_en_query and (limite is None or len(issues_raw) < limite):
+                query = construir_query_candidatos(repo_owner, repo_name, etiquetas,
+                                                   ultima_fecha, hasta, solo_cerrados, solo_con_pr)
+                print(f"   ↪️ Tope de 1000 resultados, continuando desde {ultima_fecha}")
+                continue
+        break
+
+    if limite is not None and len(issues_raw) >= limite:
+        print(f"🛑 Límite de {limite} issues alcanzado. Deteniendo descarga.")
+        issues_raw = issues_raw[:limite]
+
+    filename = f"{repo_name}_issues.json"
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(issues_raw, f, indent=4, ensure_ascii=False)
+
+    print(f"\n✅ Issues candidatos guardados en '{filename}'. Total: {len(issues_raw)}")
+    return issues_raw
+
+
 # ==========================================
 # PASO 2: Funciones auxiliares para obtener datos relacionados
 # ==========================================
@@ -89,7 +272,7 @@ def obtener_archivos_de_commit(commit_url):
     """Obtiene los archivos modificados de un commit específico."""
     files = []
     try:
-        response = requests.get(commit_url, headers=HEADERS)
+        response = POOL.get(commit_url)
         if response.status_code == 200:
             commit_data = response.json()
             files_json = commit_data.get("files", [])
@@ -103,15 +286,15 @@ def obtener_archivos_de_commit(commit_url):
                 })
         time.sleep(0.1)
     except Exception as e:
-        print(f"   ⚠️ Error obteniendo archivos del commit: {e}")
+        mostrar(f"   ⚠️ Error obteniendo archivos del commit: {e}")
     return files
 
 
 def obtener_info_de_commit(commit_sha, repo_owner=REPO_OWNER, repo_name=REPO_NAME):
     """Obtiene información detallada de un commit específico."""
     try:
-        url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/commits/{commit_sha}"
-        response = requests.get(url, headers=HEADERS)
+        url = f"{API_URL}/repos/{repo_owner}/{repo_name}/commits/{commit_sha}"
+        response = POOL.get(url)
         if response.status_code == 200:
             data = response.json()
             return {
@@ -123,24 +306,27 @@ def obtener_info_de_commit(commit_sha, repo_owner=REPO_OWNER, repo_name=REPO_NAM
             }
         time.sleep(0.1)
     except Exception as e:
-        print(f"   ⚠️ Error obteniendo commit {commit_sha}: {e}")
+        mostrar(f"   ⚠️ Error obteniendo commit {commit_sha}: {e}")
     return {"sha": commit_sha, "message": "", "author": "", "date": "", "files": []}
 
 
-def obtener_info_de_pr(pr_url):
+def obtener_info_de_pr(pr_url, campos=None):
     """
     Obtiene de un PR: 
     1. Los archivos que tocó.
     2. La lista de COMMITS que pertenecen a ese PR.
+    Con 'campos' se piden sólo los endpoints necesarios ('pr_files', 'pr_commits').
     """
     files = []
     commits = []
+    if campos is None:
+        campos = set(CAMPOS_OPCIONALES)
     
     try:
         # 1. Obtener Archivos del PR
         url_files = f"{pr_url}/files"
-        resp_files = requests.get(url_files, headers=HEADERS)
-        if resp_files.status_code == 200:
+        resp_files = POOL.get(url_files) if "pr_files" in campos else None
+        if resp_files is not None and resp_files.status_code == 200:
             for f in resp_files.json():
                 files.append({
                     "filename": f["filename"],
@@ -151,8 +337,8 @@ def obtener_info_de_pr(pr_url):
         
         # 2. Obtener Commits del PR
         url_commits = f"{pr_url}/commits"
-        resp_commits = requests.get(url_commits, headers=HEADERS)
-        if resp_commits.status_code == 200:
+        resp_commits = POOL.get(url_commits) if "pr_commits" in campos else None
+        if resp_commits is not None and resp_commits.status_code == 200:
             for c in resp_commits.json():
                 commits.append({
                     "sha": c["sha"],
@@ -164,21 +350,338 @@ def obtener_info_de_pr(pr_url):
         time.sleep(0.2)
                 
     except Exception as e:
-        print(f"   ⚠️ Error obteniendo info del PR: {e}")
+        mostrar(f"   ⚠️ Error obteniendo info del PR: {e}")
     
     return files, commits
 
 
+# ==========================================
+# PASO 2b (opcional): Índice inverso PR -> issues
+# ==========================================
+# "Fixes #12", "closes owner/repo#12", "resolved https://github.com/owner/repo/issues/12"
+PALABRAS_CIERRE = r"(?:close[sd]?|fix(?:e[sd])?|resolve[sd]?)"
+REFERENCIA = (r"(?:https?://github\.com/(?P<url_repo>[\w.-]+/[\w.-]+)/issues/(?P<url_num>\d+)"
+              r"|(?P<repo>[\w.-]+/[\w.-]+)?#(?P<num>\d+))")
+PATRON_CIERRE = re.compile(rf"\b{PALABRAS_CIERRE}:?\s+{REFERENCIA}", re.IGNORECASE)
+PATRON_REFERENCIA = re.compile(rf"(?<![\w&/#]){REFERENCIA}")
+
+# Margen al reanudar el índice: los PRs editados durante el listado se mueven de página,
+# así que se vuelven a leer los actualizados poco antes del último cursor guardado
+MARGEN_INDICE_PRS = 3600  # segundos
+
+
+def extraer_referencias(texto, repo_owner=REPO_OWNER, repo_name=REPO_NAME):
+    """
+    Issues de este repo referenciados en un texto (título o cuerpo de un PR).
+    Devuelve {número: "closes" | "mentions"}; se ignoran los de otros repos.
+    """
+    referencias = {}
+    if not texto:
+        return referencias
+    repo = f"{repo_owner}/{repo_name}".lower()
+
+    for patron, tipo in ((PATRON_CIERRE, "closes"), (PATRON_REFERENCIA, "mentions")):
+        for m in patron.finditer(texto):
+            otro_repo = m.group("url_repo") or m.group("repo")
+            if otro_repo and otro_repo.lower() != repo:
+                continue
+            num = int(m.group("url_num") or m.group("num"))
+            referencias.setdefault(num, tipo)
+    return referencias
+
+
+def _ruta_indice(repo_name):
+    return f"{repo_name}_indice_prs.json"
+
+
+def cargar_indice_prs(repo_name=REPO_NAME):
+    """Lee el índice guardado (o uno vacío si todavía no existe)."""
+    try:
+        with open(_ruta_indice(repo_name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"actualizado_hasta": None, "prs": {}, "issues": {}}
+
+
+def _restar_segundos(fecha_iso, segundos):
+    fecha = datetime.datetime.strptime(fecha_iso, '%Y-%m-%dT%H:%M:%SZ')
+    return (fecha - datetime.timedelta(seconds=segundos)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def construir_indice_prs(repo_owner=REPO_OWNER, repo_name=REPO_NAME):
+    """
+    Lista los PRs cerrados (por fecha de actualización, del más reciente al más antiguo)
+    y busca en su título y cuerpo palabras de cierre y referencias a issues.
+    Guarda '{repo}_indice_prs.json' con:
+    - prs:    número de PR -> datos del PR + issues que referencia
+    - issues: número de issue -> PRs que lo referencian
+    Es incremental: sólo pide los PRs actualizados desde la última ejecución
+    (menos MARGEN_INDICE_PRS). El cursor sólo avanza si el listado llegó hasta
+    el cursor anterior o hasta la última página; si falla a mitad, se conserva.
+    """
+    indice = cargar_indice_prs(repo_name)
+    cursor = indice.get("actualizado_hasta")
+    corte = _restar_segundos(cursor, MARGEN_INDICE_PRS) if cursor else None
+    nuevo_cursor = cursor
+    pagina = 1
+    actualizados = 0
+    params = {"state": "closed", "per_page": 100, "page": pagina, "sort": "updated", "direction": "desc"}
+    url = f"{API_URL}/repos/{repo_owner}/{repo_name}/pulls"
+
+    print(f"--- 🗂️ Actualizando índice de PRs de {repo_owner}/{repo_name} ---")
+    if cursor:
+        print(f"   Sólo PRs actualizados después de {cursor}")
+
+    terminado = False  # True sólo si se recorrió todo lo nuevo sin errores
+    while not terminado:
+        print(f"📄 Descargando página {pagina}...")
+        try:
+            resp = POOL.get(url, params=params)
+            if resp.status_code != 200:
+                print(f"Error: {resp.status_code} - {resp.reason}")
+                break
+
+            datos = resp.json()
+            if not datos:
+                terminado = True
+                break
+
+            for pr in datos:
+                if corte and pr["updated_at"] < corte:
+                    terminado = True
+                    break
+                if nuevo_cursor is None or pr["updated_at"] > nuevo_cursor:
+                    nuevo_cursor = pr["updated_at"]
+
+                texto = f"{pr.get('title') or ''}\n{pr.get('body') or ''}"
+                referencias = extraer_referencias(texto, repo_owner, repo_name)
+                referencias.pop(pr["number"], None)  # Un PR que se menciona a sí mismo
+                indice["prs"][str(pr["number"])] = {
+                    "number": pr["number"],
+                    "title": pr.get("title", ""),
+                    "url": pr.get("html_url", ""),
+                    "api_url": pr["url"],
+                    "state": pr.get("state", ""),
+                    "merged_at": pr.get("merged_at"),
+                    "updated_at": pr["updated_at"],
+                    "issues": {str(n): tipo for n, tipo in referencias.items()},
+                }
+                actualizados += 1
+
+            pagina += 1
+            params["page"] = pagina
+            time.sleep(0.5)  # Respetar rate limit
+        except Exception as e:
+            print(f"Error: {e}")
+            break
+
+    # Reconstruir issue -> PRs (un PR editado puede haber cambiado sus referencias)
+    issues = {}
+    for pr in sorted(indice["prs"].values(), key=lambda p: p["number"]):
+        for num in pr["issues"]:
+            issues.setdefault(num, []).append(pr["number"])
+    indice["issues"] = issues
+    if terminado:
+        indice["actualizado_hasta"] = nuevo_cursor
+    else:
+        print(f"⚠️ Listado incompleto: se conserva el cursor anterior ({cursor}) para reintentar.")
+
+    with open(_ruta_indice(repo_name), "w", encoding="utf-8") as f:
+        json.dump(indice, f, indent=4, ensure_ascii=False)
+
+    print(f"\n✅ Índice guardado en '{_ruta_indice(repo_name)}'")
+    print(f"   PRs nuevos o actualizados: {actualizados}")
+    print(f"   PRs en el índice: {len(indice['prs'])}, issues referenciados: {len(issues)}")
+    return indice
+
+
+def eventos_desde_indice(indice, issue_num):
+    """
+    Eventos 'cross-referenced' equivalentes a los del timeline para un issue,
+    a partir del índice de PRs (sin llamadas a la API).
+    """
+    eventos = []
+    for pr_num in indice["issues"].get(str(issue_num), []):
+        pr = indice["prs"][str(pr_num)]
+        eventos.append({
+            "event": "cross-referenced",
+            "source": {
+                "type": "issue",
+                "issue": {
+                    "number": pr["number"],
+                    "title": pr["title"],
+                    "html_url": pr["url"],
+                    "state": pr["state"],
+                    "pull_request": {"url": pr["api_url"]},
+                },
+            },
+        })
+    return eventos
+
+
 # ==========================================
 # PASO 3: Procesar issues con commits y archivos
 # ==========================================
-def get_issue_list(repo_owner=REPO_OWNER, repo_name=REPO_NAME):
+def campos_necesarios(salidas=None):
+    """Campos opcionales que necesitan las salidas indicadas (None = todos)."""
+    if salidas is None:
+        return set(CAMPOS_OPCIONALES)
+    campos = set()
+    for salida in salidas:
+        campos |= CAMPOS_POR_SALIDA[salida]
+    return campos
+
+
+def procesar_issue(item, repo_owner=REPO_OWNER, repo_name=REPO_NAME, idx=0, total=1, campos=None,
+                   indice=None):
+    """
+    Enriquece un issue crudo con sus PRs, commits y archivos afectados
+    a partir de su timeline (o del índice de PRs si se pasa 'indice').
+    Los campos opcionales que no están en 'campos' no se piden y se anotan
+    en 'pending_fields' para completarlos después con completar_issue().
+    """
+    if campos is None:
+        campos = set(CAMPOS_OPCIONALES)
+    issue_num = item['number']
+    mostrar(f"\n📌 [{idx + 1}/{total}] Procesando Issue #{issue_num}: {item['title'][:50]}...")
+
+    # Datos de relación
+    commits_relacionados = []
+    archivos_afectados = []
+    metodo_cierre = "manual"
+    prs_relacionados = []
+
+    # Usar Timeline para buscar la relación profunda (o el índice de PRs, sin llamadas)
+    events = []
+    if indice is not None:
+        events = eventos_desde_indice(indice, issue_num)
+    else:
+        timeline_url = f"{API_URL}/repos/{repo_owner}/{repo_name}/issues/{issue_num}/timeline"
+        try:
+            resp = POOL.get(timeline_url, params={"per_page": 100})
+            if resp.status_code == 200:
+                events = resp.json()
+            time.sleep(0.3)
+        except Exception as e:
+            mostrar(f"   ⚠️ Error obteniendo timeline: {e}")
+
+    archivos_set = set()
+
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+
+        evt_type = event.get('event', '')
+
+        # CASO 1: Commit cierra Issue directamente
+        if evt_type == 'closed' and event.get('commit_id'):
+            sha = event['commit_id']
+            metodo_cierre = "direct_commit"
+
+            # Obtener información detallada del commit
+            commit_info = obtener_info_de_commit(sha, repo_owner, repo_name)
+            commits_relacionados.append(commit_info)
+            archivos_set.update(commit_info.get('files', []))
+            mostrar(f"   🔗 Commit directo encontrado: {sha[:7]}")
+
+        # CASO 2: Enlace vía Pull Request
+        elif evt_type == 'cross-referenced':
+            source = event.get('source', {})
+            if source and source.get('type') == 'issue':
+                issue_data = source.get('issue', {})
+                if 'pull_request' in issue_data:
+                    pr_url = issue_data['pull_request']['url']
+                    pr_number = issue_data.get('number')
+                    metodo_cierre = "PR_linked"
+
+                    mostrar(f"   🔗 PR #{pr_number} encontrado, extrayendo commits y archivos...")
+
+                    # Extraer commits y archivos del PR
+                    files_pr, commits_pr = obtener_info_de_pr(pr_url, campos)
+
+                    pr_obj = {
+                        "number": pr_number,
+                        "title": issue_data.get('title', ''),
+                        "url": issue_data.get('html_url', ''),
+                        "state": issue_data.get('state', '')
+                    }
+                    if campos != set(CAMPOS_OPCIONALES):
+                        pr_obj["api_url"] = pr_url  # Para completar_issue()
+                    prs_relacionados.append(pr_obj)
+
+                    for f in files_pr:
+                        archivos_set.add(f['filename'])
+
+                    for c in commits_pr:
+                        if not any(existing['sha'] == c['sha'] for existing in commits_relacionados):
+                            commits_relacionados.append(c)
+
+        # CASO 3: Commit referenciado
+        elif evt_type == 'referenced' and event.get('commit_id'):
+            sha = event['commit_id']
+            if not any(c['sha'] == sha for c in commits_relacionados):
+                commit_info = obtener_info_de_commit(sha, repo_owner, repo_name)
+                commits_relacionados.append(commit_info)
+                archivos_set.update(commit_info.get('files', []))
+                mostrar(f"   📎 Commit referenciado: {sha[:7]}")
+
+    # Convertir archivos a lista con más detalle
+    archivos_afectados = list(archivos_set)
+
+    # Si no hay archivos, crear uno ficticio para Gource
+    if not archivos_afectados:
+        archivos_afectados = [f"discussions/issue_{issue_num}.txt"]
+
+    # Construir objeto del issue procesado
+    issue_obj = {
+        "id": issue_num,
+        "title": item['title'],
+        "body": item.get('body', ''),
+        "user": item['user']['login'],
+        "start_time": item['created_at'],
+        "end_time": item.get('closed_at'),
+        "state": item['state'],
+        "labels": [label['name'] for label in item.get('labels', [])],
+        "resolution_type": metodo_cierre,
+        "related_prs": prs_relacionados,
+        "related_commits": commits_relacionados,
+        "affected_files": archivos_afectados,
+        "stats": {
+            "total_commits": len(commits_relacionados),
+            "total_files": len(archivos_afectados),
+            "total_prs": len(prs_relacionados)
+        }
+    }
+
+    # Quitar los campos que ninguna salida usa y anotar lo que queda pendiente
+    if "body" not in campos:
+        del issue_obj["body"]
+    if "commit_messages" not in campos:
+        for c in commits_relacionados:
+            c.pop("message", None)
+    pendientes = [c for c in CAMPOS_OPCIONALES if c not in campos]
+    if pendientes:
+        issue_obj["pending_fields"] = pendientes
+
+    if commits_relacionados:
+        mostrar(f"   ✅ {len(commits_relacionados)} commits, {len(archivos_afectados)} archivos")
+    else:
+        mostrar(f"   ⚪ Sin commits relacionados")
+
+    return issue_obj
+
+
+def get_issue_list(repo_owner=REPO_OWNER, repo_name=REPO_NAME, salidas=None, enlace=None):
     """
     Lee los issues de 'issues.json' y los procesa para agregar:
     - Commits relacionados (con detalle)
     - Archivos afectados
     Similar a get_commit_list() en tu código original.
+    Con 'salidas' (p.ej. ["detallado"]) sólo se piden los campos que esas salidas usan.
+    Con enlace="indice" los PRs salen del índice inverso en lugar del timeline (ver MODO_ENLACE).
     """
+    campos = campos_necesarios(salidas)
+    enlace = enlace or MODO_ENLACE
     # Leer issues del archivo JSON
     input_filename = f"{repo_name}_issues.json"
     try:
@@ -189,121 +692,18 @@ def get_issue_list(repo_owner=REPO_OWNER, repo_name=REPO_NAME):
         return []
     
     print(f"\n--- 🔄 Procesando {len(issues_raw)} issues para obtener commits y archivos ---")
+    omitidos = [c for c in CAMPOS_OPCIONALES if c not in campos]
+    if omitidos:
+        print(f"   Campos omitidos (se pueden completar después): {', '.join(omitidos)}")
     
-    issues_procesados = []
+    indice = construir_indice_prs(repo_owner, repo_name) if enlace == "indice" else None
     
-    for idx, item in enumerate(issues_raw):
-        issue_num = item['number']
-        print(f"\n📌 [{idx + 1}/{len(issues_raw)}] Procesando Issue #{issue_num}: {item['title'][:50]}...")
-        
-        # Datos de relación
-        commits_relacionados = []
-        archivos_afectados = []
-        metodo_cierre = "manual"
-        prs_relacionados = []
-
-        # Usar Timeline para buscar la relación profunda
-        timeline_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/issues/{issue_num}/timeline"
-        events = []
-        try:
-            resp = requests.get(timeline_url, headers=HEADERS, params={"per_page": 100})
-            if resp.status_code == 200:
-                events = resp.json()
-            time.sleep(0.3)
-        except Exception as e:
-            print(f"   ⚠️ Error obteniendo timeline: {e}")
-
-        archivos_set = set()
-        
-        for event in events:
-            if not isinstance(event, dict):
-                continue
-                
-            evt_type = event.get('event', '')
-            
-            # CASO 1: Commit cierra Issue directamente
-            if evt_type == 'closed' and event.get('commit_id'):
-                sha = event['commit_id']
-                metodo_cierre = "direct_commit"
-                
-                # Obtener información detallada del commit
-                commit_info = obtener_info_de_commit(sha, repo_owner, repo_name)
-                commits_relacionados.append(commit_info)
-                archivos_set.update(commit_info.get('files', []))
-                print(f"   🔗 Commit directo encontrado: {sha[:7]}")
-
-            # CASO 2: Enlace vía Pull Request
-            elif evt_type == 'cross-referenced':
-                source = event.get('source', {})
-                if source and source.get('type') == 'issue':
-                    issue_data = source.get('issue', {})
-                    if 'pull_request' in issue_data:
-                        pr_url = issue_data['pull_request']['url']
-                        pr_number = issue_data.get('number')
-                        metodo_cierre = "PR_linked"
-                        
-                        print(f"   🔗 PR #{pr_number} encontrado, extrayendo commits y archivos...")
-                        
-                        # Extraer commits y archivos del PR
-                        files_pr, commits_pr = obtener_info_de_pr(pr_url)
-                        
-                        prs_relacionados.append({
-                            "number": pr_number,
-                            "title": issue_data.get('title', ''),
-                            "url": issue_data.get('html_url', ''),
-                            "state": issue_data.get('state', '')
-                        })
-                        
-                        for f in files_pr:
-                            archivos_set.add(f['filename'])
-                        
-                        for c in commits_pr:
-                            if not any(existing['sha'] == c['sha'] for existing in commits_relacionados):
-                                commits_relacionados.append(c)
-
-            # CASO 3: Commit referenciado
-            elif evt_type == 'referenced' and event.get('commit_id'):
-                sha = event['commit_id']
-                if not any(c['sha'] == sha for c in commits_relacionados):
-                    commit_info = obtener_info_de_commit(sha, repo_owner, repo_name)
-                    commits_relacionados.append(commit_info)
-                    archivos_set.update(commit_info.get('files', []))
-                    print(f"   📎 Commit referenciado: {sha[:7]}")
-
-        # Convertir archivos a lista con más detalle
-        archivos_afectados = list(archivos_set)
-        
-        # Si no hay archivos, crear uno ficticio para Gource
-        if not archivos_afectados:
-            archivos_afectados = [f"discussions/issue_{issue_num}.txt"]
-
-        # Construir objeto del issue procesado
-        issue_obj = {
-            "id": issue_num,
-            "title": item['title'],
-            "body": item.get('body', ''),
-            "user": item['user']['login'],
-            "start_time": item['created_at'],
-            "end_time": item.get('closed_at'),
-            "state": item['state'],
-            "labels": [label['name'] for label in item.get('labels', [])],
-            "resolution_type": metodo_cierre,
-            "related_prs": prs_relacionados,
-            "related_commits": commits_relacionados,
-            "affected_files": archivos_afectados,
-            "stats": {
-                "total_commits": len(commits_relacionados),
-                "total_files": len(archivos_afectados),
-                "total_prs": len(prs_relacionados)
-            }
-        }
-        
-        issues_procesados.append(issue_obj)
-        
-        if commits_relacionados:
-            print(f"   ✅ {len(commits_relacionados)} commits, {len(archivos_afectados)} archivos")
-        else:
-            print(f"   ⚪ Sin commits relacionados")
+    with ThreadPoolExecutor(max_workers=HILOS) as executor:
+        issues_procesados = list(executor.map(
+            lambda args: en_bloque(procesar_issue, args[1], repo_owner, repo_name, args[0], len(issues_raw),
+                                   campos, indice),
+            enumerate(issues_raw)
+        ))
 
     # Guardar issues procesados
     output_filename = f"{repo_name}_issues_commits.json"
@@ -313,10 +713,113 @@ def get_issue_list(repo_owner=REPO_OWNER, repo_name=REPO_NAME):
     print(f"\n✅ Procesamiento completado. Resultado en '{output_filename}'")
     print(f"   Total issues: {len(issues_procesados)}")
     print(f"   Con commits: {len([i for i in issues_procesados if i['related_commits']])}")
+    mostrar_cupos()
     
     return issues_procesados
 
 
+# ==========================================
+# PASO 4 (opcional): Completar campos pendientes bajo demanda
+# ==========================================
+def completar_issue(issue, campos, repo_owner=REPO_OWNER, repo_name=REPO_NAME):
+    """
+    Trae los campos de 'pending_fields' que estén en 'campos' para un issue ya procesado.
+    Devuelve True si el issue cambió.
+    """
+    pendientes = issue.get("pending_fields", [])
+    a_completar = [c for c in pendientes if c in campos]
+    if not a_completar:
+        return False
+
+    commits = issue.setdefault("related_commits", [])
+
+    # Archivos y commits de los PRs enlazados
+    campos_pr = {c for c in a_completar if c in ("pr_files", "pr_commits")}
+    mensajes = {}  # sha -> mensaje, de los listados {pr}/commits ya pedidos
+    if campos_pr:
+        archivos_set = {f for f in issue.get("affected_files", []) if not f.startswith("discussions/")}
+        for pr in issue.get("related_prs", []):
+            if not pr.get("api_url"):
+                continue
+            files_pr, commits_pr = obtener_info_de_pr(pr["api_url"], campos_pr)
+            archivos_set.update(f["filename"] for f in files_pr)
+            mensajes.update((c["sha"], c["message"]) for c in commits_pr)
+            for c in commits_pr:
+                if not any(existing["sha"] == c["sha"] for existing in commits):
+                    if "commit_messages" not in campos and "commit_messages" in pendientes:
+                        c.pop("message", None)
+                    commits.append(c)
+        issue["affected_files"] = list(archivos_set) or [f"discussions/issue_{issue['id']}.txt"]
+
+    # Cuerpo del issue
+    if "body" in a_completar:
+        url = f"{API_URL}/repos/{repo_owner}/{repo_name}/issues/{issue['id']}"
+        try:
+            resp = POOL.get(url)
+            if resp.status_code == 200:
+                issue["body"] = resp.json().get("body", "")
+        except Exception as e:
+            mostrar(f"   ⚠️ Error obteniendo el issue #{issue['id']}: {e}")
+
+    # Mensajes de commits: los de PRs salen del listado {pr}/commits (una llamada por PR);
+    # sólo los commits del timeline (cierre directo, referencias) van a /commits/{sha}
+    if "commit_messages" in a_completar:
+        if "pr_commits" not in campos_pr:
+            for pr in issue.get("related_prs", []):
+                if pr.get("api_url") and any(c["sha"] not in mensajes for c in commits if "message" not in c):
+                    _, commits_pr = obtener_info_de_pr(pr["api_url"], {"pr_commits"})
+                    mensajes.update((c["sha"], c["message"]) for c in commits_pr)
+        for c in commits:
+            if "message" not in c:
+                if c["sha"] in mensajes:
+                    c["message"] = mensajes[c["sha"]]
+                else:
+                    c["message"] = obtener_info_de_commit(c["sha"], repo_owner, repo_name)["message"]
+
+    issue["stats"] = {
+        "total_commits": len(commits),
+        "total_files": len(issue.get("affected_files", [])),
+        "total_prs": len(issue.get("related_prs", []))
+    }
+    restantes = [c for c in pendientes if c not in a_completar]
+    if restantes:
+        issue["pending_fields"] = restantes
+    else:
+        issue.pop("pending_fields", None)
+        for pr in issue.get("related_prs", []):
+            pr.pop("api_url", None)
+    return True
+
+
+def completar_issues(repo_owner=REPO_OWNER, repo_name=REPO_NAME, salidas=None):
+    """
+    Completa '{repo}_issues_commits.json' con los campos que necesitan 'salidas'
+    (None = todos) y que se omitieron en la extracción.
+    """
+    campos = campos_necesarios(salidas)
+    filename = f"{repo_name}_issues_commits.json"
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            issues = json.load(f)
+    except FileNotFoundError:
+        print(f"❌ No se encontró '{filename}'. Ejecuta get_issue_list() primero.")
+        return []
+
+    pendientes = [i for i in issues if any(c in campos for c in i.get("pending_fields", []))]
+    print(f"\n--- 🧩 Completando {len(pendientes)} issues con campos pendientes ---")
+
+    with ThreadPoolExecutor(max_workers=HILOS) as executor:
+        list(executor.map(lambda issue: en_bloque(completar_issue, issue, campos, repo_owner, repo_name),
+                          pendientes))
+
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(issues, f, indent=4, ensure_ascii=False)
+
+    print(f"✅ Issues completados en '{filename}'")
+    mostrar_cupos()
+    return issues
+
+
 # ==========================================
 # EJECUCIÓN PRINCIPAL
 # ==========================================
@@ -325,17 +828,25 @@ if __name__ == "__main__":
     print("=" * 60)
     print("PASO 1: Descargando issues del repositorio...")
     print("=" * 60)
-    get_issues()
+    if MODO_EXTRACCION == "candidatos":
+        if "simple" in SALIDAS:
+            print("⚠️ MODO_EXTRACCION = 'candidatos' con la salida 'simple': el log simple no tendrá los issues")
+            print("   abiertos, cerrados a mano ni cerrados por un commit directo (sólo cerrados con PR enlazado).")
+        get_issues_candidatos(etiquetas=FILTRO_LABELS, desde=FILTRO_DESDE, hasta=FILTRO_HASTA)
+    else:
+        get_issues()
     
     # PASO 2: Procesar issues para obtener commits y archivos
     print("\n" + "=" * 60)
     print("PASO 2: Procesando issues para obtener commits relacionados...")
     print("=" * 60)
-    issues = get_issue_list()
+    issues = get_issue_list(salidas=SALIDAS)
     
     print("\n" + "=" * 60)
     print("✅ PROCESO COMPLETADO")
     print("=" * 60)
     print("Archivos generados:")
     print(f"  📄 {REPO_NAME}_issues.json - Issues crudos del repositorio")
-    print(f"  📄 {REPO_NAME}_issues_commits.json - Issues con commits y archivos relacionados")
\ No newline at end of file
+    print(f"  📄 {REPO_NAME}_issues_commits.json - Issues con commits y archivos relacionados")
+    if MODO_ENLACE == "indice":
+        print(f"  📄 {REPO_NAME}_indice_prs.json - Índice PR -> issues")
\ No newline at end of file
@@ -1,10 +1,28 @@
 import json
+import os
 import datetime
 from datetime import timezone
 
 # --- CONFIGURACIÓN ---
 REPO_NAME = "flask"  # Nombre del repositorio
 
+# Lector de '{repo}_issues_commits.json':
+#   "streaming" -> lee issue a issue (JSON array o JSON Lines) quedándose sólo con los campos usados
+#   "completo"  -> json.load de todo el archivo (implementación original)
+LECTOR = "streaming"
+TAM_BLOQUE = 1 << 16  # Caracteres leídos por bloque en el lector streaming
+
+# Campos que usa cada conversor (None = el valor completo; lista = claves de cada elemento)
+CAMPOS_LOG = {
+    'id': None, 'title': None, 'user': None, 'start_time': None, 'end_time': None,
+    'state': None, 'labels': None, 'affected_files': None, 'pending_fields': None,
+    'related_commits': ['sha', 'author', 'date', 'files'],
+}
+CAMPOS_DETALLADO = {
+    'id': None, 'resolution_type': None, 'affected_files': None,
+    'user': None, 'start_time': None, 'end_time': None, 'state': None,
+}
+
 # Colores por extensión (evitando rojos para no confundir con issues)
 EXTENSION_COLORS = {
     # Código fuente - tonos azules
@@ -60,7 +78,109 @@ def convert_date_to_timestamp(date_str):
         return None
 
 
-def json_to_gource_log(repo_name=REPO_NAME, output_file=None):
+def _proyectar(issue, campos):
+    """Se queda sólo con los campos indicados (y, en listas de dicts, sólo con sus sub-claves)."""
+    proyectado = {}
+    for campo, subcampos in campos.items():
+        if campo not in issue:
+            continue
+        valor = issue[campo]
+        if subcampos is not None and isinstance(valor, list):
+            valor = [{k: v[k] for k in subcampos if k in v} if isinstance(v, dict) else v for v in valor]
+        proyectado[campo] = valor
+    return proyectado
+
+
+def _saltar(f, buffer, pos, fin_archivo, caracteres=' \t\r\n'):
+    """
+    Avanza 'pos' sobre 'caracteres', leyendo más bloques si hace falta.
+    Devuelve (buffer, pos, fin_archivo); pos == len(buffer) sólo al final del archivo.
+    """
+    while True:
+        while pos < len(buffer) and buffer[pos] in caracteres:
+            pos += 1
+        if pos < len(buffer) or fin_archivo:
+            return buffer, pos, fin_archivo
+        buffer, pos = f.read(TAM_BLOQUE), 0
+        fin_archivo = not buffer
+
+
+def _iterar_array(f, campos):
+    """Decodifica uno a uno los elementos de un array JSON sin cargarlo entero."""
+    decoder = json.JSONDecoder()
+
+    # Saltar espacios iniciales y el '[' (pueden no estar en el primer bloque)
+    buffer, pos, fin_archivo = _saltar(f, f.read(TAM_BLOQUE), 0, False)
+    if buffer[pos:pos + 1] != '[':
+        raise json.JSONDecodeError("Se esperaba '['", buffer, pos)
+    pos += 1
+
+    while True:
+        # Saltar espacios y comas entre elementos
+        buffer, pos, fin_archivo = _saltar(f, buffer, pos, fin_archivo, ' \t\r\n,')
+        if pos >= len(buffer) or buffer[pos] == ']':
+            return
+
+        try:
+            issue, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Elemento incompleto: leer más (al menos lo que ya hay, para no re-decodificar en cuadrático)
+            if fin_archivo:
+                raise
+            bloque = f.read(max(TAM_BLOQUE, len(buffer) - pos))
+            fin_archivo = not bloque
+            buffer, pos = buffer[pos:] + bloque, 0
+            continue
+
+        yield _proyectar(issue, campos) if campos else issue
+
+
+def _iterar_lineas(f, campos):
+    """JSON Lines: un issue por línea."""
+    for linea in f:
+        if linea.strip():
+            issue = json.loads(linea)
+            yield _proyectar(issue, campos) if campos else issue
+
+
+def _generar_issues(f, campos):
+    with f:
+        buffer, pos, _ = _saltar(f, f.read(TAM_BLOQUE), 0, False)
+        es_array = buffer[pos:pos + 1] == '['
+        f.seek(0)
+        if es_array:
+            yield from _iterar_array(f, campos)
+        else:
+            yield from _iterar_lineas(f, campos)
+
+
+def iterar_issues(input_file, campos=None):
+    """
+    Itera los issues de un '{repo}_issues_commits.json' (array JSON) o '.jsonl'
+    (JSON Lines) de uno en uno, con memoria constante.
+    Con 'campos' (ver CAMPOS_LOG) cada issue trae sólo los campos indicados.
+    El archivo se abre al llamar (FileNotFoundError aquí, no al iterar).
+    """
+    return _generar_issues(open(input_file, "r", encoding="utf-8"), campos)
+
+
+def leer_issues(input_file, campos=None, lector=None):
+    """Issues de 'input_file' según el lector configurado (ver LECTOR)."""
+    if (lector or LECTOR) == "completo":
+        with open(input_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return iterar_issues(input_file, campos)
+
+
+def ruta_entrada(repo_name):
+    """'{repo}_issues_commits.json', o su versión JSON Lines si sólo existe esa."""
+    ruta = f"{repo_name}_issues_commits.json"
+    if not os.path.exists(ruta) and os.path.exists(f"{repo_name}_issues_commits.jsonl"):
+        return f"{repo_name}_issues_commits.jsonl"
+    return ruta
+
+
+def json_to_gource_log(repo_name=REPO_NAME, output_file=None, input_file=None, lector=None):
     """
     Transforma el JSON de issues con commits a formato Gource.
     
@@ -73,22 +193,27 @@ def json_to_gource_log(repo_name=REPO_NAME, output_file=None):
     """
     
     # Leer el JSON
-    input_file = f"{repo_name}_issues_commits.json"
+    if input_file is None:
+        input_file = ruta_entrada(repo_name)
     if output_file is None:
         output_file = f"{repo_name}_gource.log"
     
     try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            issues = json.load(f)
+        issues = leer_issues(input_file, CAMPOS_LOG, lector)
     except FileNotFoundError:
         print(f"❌ No se encontró '{input_file}'")
         return
     
-    print(f"📊 Procesando {len(issues)} issues...")
+    print(f"📊 Procesando issues de '{input_file}'...")
     
     gource_entries = []
+    total_issues = 0
+    sin_commits_pr = 0
     
     for issue in issues:
+        total_issues += 1
+        if 'pr_commits' in issue.get('pending_fields', []):
+            sin_commits_pr += 1
         issue_id = issue.get('id')
         issue_title = issue.get('title', '').replace('|', '-')  # Evitar conflictos con separador
         user = issue.get('user', 'unknown')
@@ -181,6 +306,10 @@ def json_to_gource_log(repo_name=REPO_NAME, output_file=None):
                     'path': issue_path
                 })
     
+    if sin_commits_pr:
+        print(f"⚠️ {sin_commits_pr} issues se extrajeron sin los commits de sus PRs. "
+              f"Usa completar_issues(salidas=['simple']) en extraer_issues.py para traerlos.")
+    
     # Ordenar por timestamp
     gource_entries.sort(key=lambda x: x['timestamp'])
     
@@ -192,7 +321,7 @@ def json_to_gource_log(repo_name=REPO_NAME, output_file=None):
     
     print(f"✅ Archivo Gource generado: '{output_file}'")
     print(f"   Total de entradas: {len(gource_entries)}")
-    print(f"   Issues procesados: {len(issues)}")
+    print(f"   Issues procesados: {total_issues}")
     
     # Estadísticas
     adds = len([e for e in gource_entries if e['action'] == 'A'])
@@ -203,7 +332,7 @@ def json_to_gource_log(repo_name=REPO_NAME, output_file=None):
     return gource_entries
 
 
-def json_to_gource_detailed(repo_name=REPO_NAME, output_file=None):
+def json_to_gource_detailed(repo_name=REPO_NAME, output_file=None, input_file=None, lector=None):
     """
     Estructura: Cada archivo es una rama principal, issues son hijos.
     
@@ -215,13 +344,13 @@ def json_to_gource_detailed(repo_name=REPO_NAME, output_file=None):
     Así se ve claramente qué archivo tiene cuántas issues relacionadas.
     """
     
-    input_file = f"{repo_name}_issues_commits.json"
+    if input_file is None:
+        input_file = ruta_entrada(repo_name)
     if output_file is None:
         output_file = f"{repo_name}_gource_detailed.log"
     
     try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            issues = json.load(f)
+        issues = leer_issues(input_file, CAMPOS_DETALLADO, lector)
     except FileNotFoundError:
         print(f"❌ No se encontró '{input_file}'")
         return
@@ -317,7 +446,7 @@ def json_to_gource_detailed(repo_name=REPO_NAME, output_file=None):
     return gource_entries
 
 
-def merge_logs(repo_name=REPO_NAME, git_log_file="gource_original.log", output_file=None):
+def merge_logs(repo_name=REPO_NAME, git_log_file="gource_original.log", output_file=None, input_file=None, lector=None):
     """
     Unificación Cronológica (Chronological Merging):
     - Lee el log nativo de Git
@@ -327,7 +456,8 @@ def merge_logs(repo_name=REPO_NAME, git_log_file="gource_original.log", output_f
     - Mezcla todo ordenando por timestamp
     """
     
-    input_file = f"{repo_name}_issues_commits.json"
+    if input_file is None:
+        input_file = ruta_entrada(repo_name)
     if output_file is None:
         output_file = f"{repo_name}_merged.log"
     
@@ -356,8 +486,7 @@ def merge_logs(repo_name=REPO_NAME, git_log_file="gource_original.log", output_f
     
     # 2. Leer issues JSON
     try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            issues = json.load(f)
+        issues = leer_issues(input_file, CAMPOS_DETALLADO, lector)
     except FileNotFoundError:
         print(f"❌ No se encontró '{input_file}'")
         return
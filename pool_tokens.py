@@ -0,0 +1,136 @@
+import threading
+import time
+import sys
+import requests
+
+ACCEPT = 'application/vnd.github.v3+json'
+
+# Cupo de un token del que el servidor no ha informado (sin cabeceras X-RateLimit-*): sin límite
+SIN_LIMITE = float('inf')
+
+# Leer tokens desde archivo (uno por línea)
+def cargar_tokens(ruta="t.txt"):
+    """
+    Lee uno o varios tokens de GitHub, uno por línea.
+    Se ignoran las líneas vacías y las que empiezan por '#'.
+    Un 't.txt' con un solo token sigue funcionando igual que antes.
+    """
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            tokens = [l.strip() for l in f if l.strip() and not l.strip().startswith('#')]
+    except FileNotFoundError:
+        print(f"❌ Error: No se encontró el archivo '{ruta}' con el token de GitHub.")
+        print(f"   Crea un archivo '{ruta}' con tu token de GitHub (uno por línea si tienes varios).")
+        sys.exit(1)
+
+    if not tokens:
+        print(f"❌ Error: '{ruta}' no contiene ningún token.")
+        sys.exit(1)
+    return tokens
+
+
+def recurso_de_url(url):
+    """Cupo de la API al que cuenta una URL ('search' tiene un límite aparte)."""
+    return 'search' if '/search/' in url else 'core'
+
+
+class PoolTokens:
+    """
+    Reparte las peticiones entre varios tokens de GitHub.
+
+    Por cada (token, recurso) guarda el cupo restante y la hora de reinicio que
+    devuelve la API en las cabeceras X-RateLimit-*, y cada petición sale con el
+    token que tiene más cupo (a igualdad, el que menos peticiones ha enviado).
+    Sólo se descuenta cupo informado por el servidor: un token sin cabeceras se
+    considera sin límite. Si todos están agotados, espera al primer reinicio.
+    Es seguro usarlo desde varios hilos: cada hilo usa su propia sesión
+    (requests.Session no garantiza ser thread-safe), creada con 'session_factory'.
+    """
+
+    def __init__(self, tokens, session_factory=requests.Session, espera_maxima=3600):
+        self.tokens = list(tokens)
+        self.session_factory = session_factory
+        self.espera_maxima = espera_maxima
+        self._local = threading.local()
+        self._cupos = {}  # (token, recurso) -> {'restante': int, 'reinicio': epoch}
+        self._enviadas = {t: 0 for t in self.tokens}
+        self._lock = threading.Lock()
+
+    def _restante(self, token, recurso, ahora):
+        cupo = self._cupos.get((token, recurso))
+        if cupo is None or cupo['reinicio'] <= ahora:
+            return SIN_LIMITE
+        return cupo['restante']
+
+    def _elegir_token(self, recurso):
+        """Reserva una petición en el token con más cupo; None si todos están agotados."""
+        with self._lock:
+            ahora = time.time()
+            token = max(self.tokens, key=lambda t: (self._restante(t, recurso, ahora), -self._enviadas[t]))
+            if self._restante(token, recurso, ahora) <= 0:
+                return None
+            cupo = self._cupos.get((token, recurso))
+            if cupo is not None and cupo['reinicio'] > ahora:
+                cupo['restante'] -= 1  # Se corrige con las cabeceras de la respuesta
+            self._enviadas[token] += 1
+            return token
+
+    def _segundos_hasta_reinicio(self, recurso):
+        with self._lock:
+            ahora = time.time()
+            reinicios = [self._cupos[(t, recurso)]['reinicio'] for t in self.tokens
+                         if (t, recurso) in self._cupos]
+        if not reinicios:
+            return 0
+        return max(0, min(reinicios) - ahora) + 1
+
+    def actualizar(self, token, resp, recurso=None):
+        """Actualiza el cupo de un token con las cabeceras X-RateLimit-* de una respuesta."""
+        restante = resp.headers.get('X-RateLimit-Remaining')
+        reinicio = resp.headers.get('X-RateLimit-Reset')
+        if restante is None or reinicio is None:
+            return
+        recurso = resp.headers.get('X-RateLimit-Resource', recurso or 'core')
+        with self._lock:
+            self._cupos[(token, recurso)] = {'restante': int(restante), 'reinicio': int(reinicio)}
+
+    def session(self):
+        """Sesión HTTP del hilo actual."""
+        sesion = getattr(self._local, "session", None)
+        if sesion is None:
+            sesion = self._local.session = self.session_factory()
+        return sesion
+
+    def headers(self, token):
+        return {'Authorization': f'token {token}', 'Accept': ACCEPT}
+
+    def get(self, url, params=None):
+        """GET autenticado con el mejor token disponible (mismos parámetros que requests.get)."""
+        recurso = recurso_de_url(url)
+        intentos = 0
+        while True:
+            token = self._elegir_token(recurso)
+            if token is None:
+                espera = min(self._segundos_hasta_reinicio(recurso), self.espera_maxima)
+                print(f"   ⏳ Todos los tokens sin cupo ({recurso}). Esperando {espera:.0f}s...")
+                time.sleep(espera)
+                continue
+
+            resp = self.session().get(url, headers=self.headers(token), params=params)
+            self.actualizar(token, resp, recurso)
+
+            # Límite agotado para este token: probar con otro
+            agotado = resp.status_code in (403, 429) and resp.headers.get('X-RateLimit-Remaining') == '0'
+            if agotado and intentos < len(self.tokens):
+                intentos += 1
+                continue
+            return resp
+
+    def estado(self):
+        """Cupo restante conocido por token (últimos 4 caracteres) y recurso."""
+        with self._lock:
+            ahora = time.time()
+            return {
+                f"…{t[-4:]}": {r: self._restante(t, r, ahora) for (tt, r) in self._cupos if tt == t}
+                for t in self.tokens
+            }
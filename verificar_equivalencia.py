@@ -0,0 +1,267 @@
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+
+import json_to_gource
+
+# --- CONFIGURACIÓN ---
+# Repos con fixtures commiteados: {repo}_issues_commits.json + sus tres logs
+REPOS_FIXTURES = ["flask", "Gource"]
+GIT_LOG_FIXTURE = "gource_original.log"
+
+# Modos a comparar: nombre -> (kwargs extra para los tres conversores, formato de entrada).
+# "referencia" es la implementación de referencia; cualquier ruta optimizada
+# nueva se registra aquí y tiene que producir exactamente los mismos bytes.
+# Formato "jsonl": la entrada se convierte antes a JSON Lines.
+MODOS = {
+    "referencia": ({"lector": "completo"}, "json"),
+    "streaming": ({"lector": "streaming"}, "json"),
+    "streaming_jsonl": ({"lector": "streaming"}, "jsonl"),
+}
+
+# Conversores: nombre -> (función, sufijo del log commiteado, usa log de Git)
+CONVERSORES = {
+    "simple": (json_to_gource.json_to_gource_log, "_gource.log", False),
+    "detallado": (json_to_gource.json_to_gource_detailed, "_gource_detailed.log", False),
+    "unificado": (json_to_gource.merge_logs, "_merged.log", True),
+}
+
+# Tamaños de las pruebas sintéticas (issues por caso)
+CASOS_SINTETICOS = [(1, 50), (2, 2000), (3, 20000)]  # (semilla, n_issues)
+
+# Lector en streaming con bloques diminutos: entradas con espacios alrededor del '['
+TAMS_BLOQUE_PEQUENOS = [1, 2, 3, 7]
+ENTRADAS_BORDE = ['  [ ]  ', '[]', '\n\n   [ {"id": 1} ,\n {"id": 2}]\n', '     [{"id": [1, 2]}]',
+                  '{"id": 1}\n\n{"id": 2}\n', '   ', '']
+
+
+# ==========================================
+# Ejecución de un conversor y comparación
+# ==========================================
+def a_jsonl(input_file, directorio):
+    """Copia un '{repo}_issues_commits.json' en formato JSON Lines (una vez por archivo)."""
+    nombre = os.path.basename(input_file).rsplit(".", 1)[0] + ".jsonl"
+    destino = os.path.join(directorio, nombre)
+    if not os.path.exists(destino):
+        with open(input_file, "r", encoding="utf-8") as f:
+            issues = json.load(f)
+        with open(destino, "w", encoding="utf-8") as f:
+            for issue in issues:
+                f.write(json.dumps(issue, ensure_ascii=False) + "\n")
+    return destino
+
+
+def ejecutar(conversor, modo, input_file, output_file, git_log_file=None):
+    """Ejecuta un conversor en un modo (sin imprimir nada) y devuelve los bytes generados."""
+    funcion, _, usa_git = CONVERSORES[conversor]
+    kwargs_modo, formato = MODOS[modo]
+    if formato == "jsonl":
+        input_file = a_jsonl(input_file, os.path.dirname(output_file))
+    kwargs = dict(kwargs_modo, input_file=input_file, output_file=output_file)
+    if usa_git:
+        kwargs["git_log_file"] = git_log_file
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcion(**kwargs)
+
+    with open(output_file, "rb") as f:
+        return f.read()
+
+
+def primera_diferencia(esperado, obtenido):
+    """
+    Devuelve None si los bytes son idénticos; si no, (n_línea, esperada, obtenida)
+    de la primera línea distinta (None cuando a uno de los dos le faltan líneas).
+    """
+    if esperado == obtenido:
+        return None
+    lineas_a = esperado.decode("utf-8").split("\n")
+    lineas_b = obtenido.decode("utf-8").split("\n")
+    for n in range(max(len(lineas_a), len(lineas_b))):
+        a = lineas_a[n] if n < len(lineas_a) else None
+        b = lineas_b[n] if n < len(lineas_b) else None
+        if a != b:
+            return n + 1, a, b
+    return len(lineas_a), "", ""  # Sólo difieren en bytes que no cambian el texto
+
+
+def reportar(nombre, diferencia):
+    if diferencia is None:
+        print(f"   ✅ {nombre}")
+        return True
+    n, a, b = diferencia
+    print(f"   ❌ {nombre}: primera diferencia en la línea {n}")
+    print(f"      esperado: {a!r}")
+    print(f"      obtenido: {b!r}")
+    return False
+
+
+# ==========================================
+# Datos sintéticos
+# ==========================================
+def generar_issues_sinteticos(n_issues, semilla):
+    """
+    Issues aleatorios con la misma forma que '{repo}_issues_commits.json'.
+    Las fechas se concentran en pocos segundos distintos para que haya muchos
+    timestamps iguales y se note cualquier cambio en el orden estable.
+    """
+    rnd = random.Random(semilla)
+    autores = ["alice", "bob", "carla", "dmitri", "Émile", "李雷", "x|y"]
+    labels = ["bug", "Bug report", "enhancement", "feature request", "docs", "documentation", "question"]
+    archivos = [f"src/mod_{i}/file_{j}.{ext}" for i in range(20) for j in range(10)
+                for ext in rnd.sample(["py", "cpp", "h", "md", "rst", "txt"], 1)]
+    archivos += ["README", "Makefile.am", "data/gource.1", ".gitignore"]
+    base = 1_600_000_000
+
+    def fecha(formato_alternativo=False):
+        ts = base + rnd.randrange(0, max(10, n_issues // 4)) * 60 + rnd.choice([0, 0, 0, 1, 60])
+        texto = json_to_gource.datetime.datetime.fromtimestamp(ts, json_to_gource.timezone.utc)
+        if formato_alternativo:
+            return texto.isoformat()  # '+00:00' en lugar de 'Z'
+        return texto.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    issues = []
+    for n in range(n_issues):
+        issue_id = rnd.randrange(1, n_issues * 3)  # Puede repetirse a propósito
+        resolution = rnd.choice(["manual", "direct_commit", "PR_linked", "PR_linked"])
+        estado = rnd.choice(["open", "closed", "closed"])
+
+        commits = []
+        for _ in range(rnd.choice([0, 0, 1, 2, 5])):
+            commit = {"sha": "%040x" % rnd.getrandbits(160)}
+            if rnd.random() < 0.9:
+                commit["author"] = rnd.choice(autores)
+            commit["date"] = fecha(rnd.random() < 0.1) if rnd.random() < 0.85 else ""
+            if rnd.random() < 0.5:
+                commit["files"] = rnd.sample(archivos, rnd.randint(1, 4))
+            commits.append(commit)
+
+        afectados = rnd.sample(archivos, rnd.randint(0, 6))
+        if not afectados or rnd.random() < 0.1:
+            afectados.append(f"discussions/issue_{issue_id}.txt")
+
+        issue = {
+            "id": issue_id,
+            "title": rnd.choice(["Crash | on start", "Docs typo", "Añadir opción", "Leak"]),
+            "start_time": fecha(rnd.random() < 0.1) if rnd.random() < 0.97 else None,
+            "end_time": fecha() if estado == "closed" and rnd.random() < 0.95 else None,
+            "state": estado,
+            "labels": rnd.sample(labels, rnd.randint(0, 2)),
+            "resolution_type": resolution,
+            "related_prs": [],
+            "related_commits": commits,
+            "affected_files": afectados,
+        }
+        if rnd.random() < 0.97:
+            issue["user"] = rnd.choice(autores)
+        issues.append(issue)
+    return issues
+
+
+def generar_git_log_sintetico(n_lineas, semilla):
+    """Log de Git en formato Gource con timestamps repetidos."""
+    rnd = random.Random(semilla)
+    base = 1_600_000_000
+    lineas = []
+    for _ in range(n_lineas):
+        ts = base + rnd.randrange(0, max(10, n_lineas // 4)) * 60
+        autor = rnd.choice(["alice", "bob", "Émile"])
+        accion = rnd.choice(["A", "M", "M", "D"])
+        path = f"/src/mod_{rnd.randrange(20)}/file_{rnd.randrange(10)}.{rnd.choice(['py', 'cpp', 'md', 'xyz'])}"
+        lineas.append(f"{ts}|{autor}|{accion}|{path}\n")
+    lineas.sort(key=lambda l: int(l.split('|')[0]))
+    return "".join(lineas)
+
+
+# ==========================================
+# Verificaciones
+# ==========================================
+def verificar_fixtures(directorio):
+    """Cada modo debe reproducir byte a byte los logs commiteados de cada repo."""
+    print("\n📌 Fixtures commiteados")
+    ok = True
+    for repo in REPOS_FIXTURES:
+        input_file = f"{repo}_issues_commits.json"
+        for conversor, (_, sufijo, _) in CONVERSORES.items():
+            with open(f"{repo}{sufijo}", "rb") as f:
+                esperado = f.read()
+            for modo in MODOS:
+                salida = os.path.join(directorio, f"{repo}_{conversor}_{modo}.log")
+                obtenido = ejecutar(conversor, modo, input_file, salida, GIT_LOG_FIXTURE)
+                ok &= reportar(f"{repo} / {conversor} / {modo}", primera_diferencia(esperado, obtenido))
+    return ok
+
+
+def verificar_sinteticos(directorio):
+    """Cada modo debe producir los mismos bytes que 'referencia' sobre datos aleatorios."""
+    print("\n📌 Datos sintéticos")
+    ok = True
+    for semilla, n_issues in CASOS_SINTETICOS:
+        input_file = os.path.join(directorio, f"sintetico_{semilla}_issues_commits.json")
+        git_log_file = os.path.join(directorio, f"sintetico_{semilla}_git.log")
+        with open(input_file, "w", encoding="utf-8") as f:
+            json.dump(generar_issues_sinteticos(n_issues, semilla), f, indent=4, ensure_ascii=False)
+        with open(git_log_file, "w", encoding="utf-8") as f:
+            f.write(generar_git_log_sintetico(n_issues, semilla))
+
+        for conversor in CONVERSORES:
+            salida = os.path.join(directorio, f"sintetico_{semilla}_{conversor}_referencia.log")
+            esperado = ejecutar(conversor, "referencia", input_file, salida, git_log_file)
+            n_lineas = esperado.count(b"\n")
+            print(f"   · semilla {semilla} ({n_issues} issues) / {conversor}: {n_lineas} líneas de referencia")
+            for modo in MODOS:
+                if modo == "referencia":
+                    continue
+                salida = os.path.join(directorio, f"sintetico_{semilla}_{conversor}_{modo}.log")
+                obtenido = ejecutar(conversor, modo, input_file, salida, git_log_file)
+                nombre = f"semilla {semilla} ({n_issues} issues) / {conversor} / {modo}"
+                ok &= reportar(nombre, primera_diferencia(esperado, obtenido))
+    return ok
+
+
+def verificar_bloques_pequenos(directorio):
+    """El lector en streaming debe dar lo mismo que json.load aunque cada token cruce bloques."""
+    print("\n📌 Lector en streaming con bloques pequeños")
+    ok = True
+    tam_original = json_to_gource.TAM_BLOQUE
+    try:
+        for n, texto in enumerate(ENTRADAS_BORDE):
+            input_file = os.path.join(directorio, f"borde_{n}.json")
+            with open(input_file, "w", encoding="utf-8") as f:
+                f.write(texto)
+            if texto.strip().startswith("["):
+                esperado = json.loads(texto)
+            else:
+                esperado = [json.loads(l) for l in texto.splitlines() if l.strip()]
+            for tam in TAMS_BLOQUE_PEQUENOS:
+                json_to_gource.TAM_BLOQUE = tam
+                obtenido = list(json_to_gource.iterar_issues(input_file))
+                if obtenido != esperado:
+                    print(f"   ❌ {texto!r} / TAM_BLOQUE={tam}: esperado {esperado!r}, obtenido {obtenido!r}")
+                    ok = False
+    finally:
+        json_to_gource.TAM_BLOQUE = tam_original
+    if ok:
+        print(f"   ✅ {len(ENTRADAS_BORDE)} entradas x TAM_BLOQUE {TAMS_BLOQUE_PEQUENOS}")
+    return ok
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("VERIFICANDO EQUIVALENCIA DE LOS CONVERSORES GOURCE")
+    print("=" * 60)
+    print(f"Modos: {', '.join(MODOS)}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ok = verificar_fixtures(directorio)
+        ok &= verificar_sinteticos(directorio)
+        ok &= verificar_bloques_pequenos(directorio)
+
+    print("\n" + "=" * 60)
+    print("✅ SALIDAS IDÉNTICAS" if ok else "❌ HAY DIFERENCIAS")
+    print("=" * 60)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,476 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONFIGURACIÓN ---
+REPO_OWNER = "o"
+REPO_NAME = "r"
+API_URL = "http://api.falsa"
+
+
+# ==========================================
+# API falsa (sin red)
+# ==========================================
+class RespuestaFalsa:
+    def __init__(self, status_code=200, datos=None, headers=None):
+        self.status_code = status_code
+        self.reason = "OK" if status_code == 200 else "Error"
+        self.headers = headers or {}
+        self._datos = datos
+
+    def json(self):
+        return self._datos
+
+
+class SesionFalsa:
+    """
+    Sustituye a requests.Session: 'responder(url, params, token)' decide la respuesta
+    y se guarda cada petición en 'peticiones' como (url, params, token).
+    """
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.peticiones = []
+
+    def get(self, url, headers=None, params=None):
+        token = (headers or {}).get("Authorization", "").split(" ")[-1]
+        self.peticiones.append((url, dict(params or {}), token))
+        return self.responder(url, params or {}, token)
+
+
+def comprobar(nombre, obtenido, esperado):
+    if obtenido == esperado:
+        print(f"   ✅ {nombre}")
+        return True
+    print(f"   ❌ {nombre}")
+    print(f"      esperado: {esperado!r}")
+    print(f"      obtenido: {obtenido!r}")
+    return False
+
+
+def cargar_extraer_issues():
+    """
+    Importa extraer_issues desde un directorio temporal con un 't.txt' de prueba
+    (lo lee al importarse) y apuntando a la API falsa.
+    """
+    with open("t.txt", "w", encoding="utf-8") as f:
+        f.write("falso\n")
+    os.environ["GITHUB_API_URL"] = API_URL
+    with contextlib.redirect_stdout(io.StringIO()):
+        import extraer_issues
+    extraer_issues.time.sleep = lambda segundos: None
+    return extraer_issues
+
+
+# ==========================================
+# Pool de tokens
+# ==========================================
+class RelojFalso:
+    """Sustituye al módulo time en pool_tokens: sleep() avanza el reloj sin esperar."""
+
+    def __init__(self, ahora=1_000_000):
+        self.ahora = ahora
+        self.esperas = []
+
+    def time(self):
+        return self.ahora
+
+    def sleep(self, segundos):
+        self.esperas.append(segundos)
+        self.ahora += segundos
+
+
+def responder_cupos(reloj, cupos, agotados=None):
+    """
+    200 con X-RateLimit-* según el cupo de cada token. 'agotados' (token -> segundos
+    hasta el reinicio) responde 403 con Remaining 0 hasta que pase ese reinicio.
+    """
+    usados = {t: 0 for t in cupos}
+    reinicios = {t: reloj.ahora + s for t, s in (agotados or {}).items()}
+
+    def responder(url, params, token):
+        if token in reinicios and reloj.ahora < reinicios[token]:
+            return RespuestaFalsa(403, {}, {"X-RateLimit-Remaining": "0",
+                                            "X-RateLimit-Reset": str(reinicios[token])})
+        usados[token] += 1
+        return RespuestaFalsa(200, {}, {"X-RateLimit-Remaining": str(cupos[token] - usados[token]),
+                                        "X-RateLimit-Reset": str(reloj.ahora + 3600)})
+    return responder
+
+
+def verificar_pool():
+    print("\n📌 Reparto de peticiones entre tokens")
+    import pool_tokens
+
+    ok = True
+    reloj = RelojFalso()
+    pool_tokens.time = reloj
+    url = f"{API_URL}/repos/{REPO_OWNER}/{REPO_NAME}/issues"
+
+    # a/b/c con 10/100/50 de cupo: una vuelta para conocerlos y después todo a b
+    sesion = SesionFalsa(responder_cupos(reloj, {"a": 10, "b": 100, "c": 50}))
+    pool = pool_tokens.PoolTokens(["a", "b", "c"], session_factory=lambda: sesion)
+    for _ in range(6):
+        pool.get(url)
+    ok &= comprobar("Primera vuelta y después el de más cupo",
+                    [t for _, _, t in sesion.peticiones], ["a", "b", "c", "b", "b", "b"])
+    ok &= comprobar("estado(): cupo restante por token", pool.estado(),
+                    {"…a": {"core": 9}, "…b": {"core": 96}, "…c": {"core": 49}})
+
+    # 403 con Remaining 0 en b: la misma petición se repite con otro token
+    sesion.responder = responder_cupos(reloj, {"a": 10, "b": 100, "c": 50}, agotados={"b": 600})
+    sesion.peticiones.clear()
+    resp = pool.get(url)
+    ok &= comprobar("403 agotado -> otro token", ([t for _, _, t in sesion.peticiones], resp.status_code),
+                    (["b", "c"], 200))
+
+    # Todos agotados: espera al primer reinicio (b, en 10 s) y sigue con ese token
+    sesion = SesionFalsa(responder_cupos(reloj, {"a": 10, "b": 10, "c": 10},
+                                         agotados={"a": 30, "b": 10, "c": 20}))
+    pool = pool_tokens.PoolTokens(["a", "b", "c"], session_factory=lambda: sesion)
+    with contextlib.redirect_stdout(io.StringIO()):
+        resp = pool.get(url)
+    ok &= comprobar("Todos agotados -> espera al primer reinicio",
+                    ([t for _, _, t in sesion.peticiones], reloj.esperas, resp.status_code),
+                    (["a", "b", "c", "b"], [11], 200))
+
+    # Sin cabeceras X-RateLimit-* (API local): sin límite inventado ni esperas
+    reloj.esperas.clear()
+    sesion = SesionFalsa(lambda url, params, token: RespuestaFalsa(200, {}))
+    pool = pool_tokens.PoolTokens(["a", "b"], session_factory=lambda: sesion)
+    for _ in range(12000):
+        pool.get(url)
+    ok &= comprobar("Sin cabeceras: reparto alterno y sin esperas",
+                    ([t for _, _, t in sesion.peticiones[:4]], reloj.esperas), (["a", "b", "a", "b"], []))
+
+    # Varios hilos: cada uno con su propia sesión, reutilizada entre peticiones
+    sesiones = []
+
+    def nueva_sesion():
+        sesiones.append(SesionFalsa(lambda url, params, token: RespuestaFalsa(200, {})))
+        return sesiones[-1]
+
+    def peticiones_en_hilo(_):
+        barrera.wait()  # Los tres hilos a la vez: ninguno reutiliza el hilo de otro
+        for _ in range(5):
+            pool.get(url)
+
+    pool = pool_tokens.PoolTokens(["a", "b"], session_factory=nueva_sesion)
+    barrera = threading.Barrier(3)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(peticiones_en_hilo, range(3)))
+    ok &= comprobar("Una sesión por hilo", sorted(len(s.peticiones) for s in sesiones), [5, 5, 5])
+
+    pool_tokens.time = __import__("time")
+    return ok
+
+
+# ==========================================
+# Salida agrupada por issue
+# ==========================================
+def verificar_salida(ei):
+    print("\n📌 Mensajes de cada issue juntos")
+    barrera = threading.Barrier(3)
+
+    def issue_falso(n):
+        for paso in range(3):
+            ei.mostrar(f"issue {n} paso {paso}")
+            barrera.wait()  # Fuerza a que los hilos se intercalen
+        return n
+
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida), ThreadPoolExecutor(max_workers=3) as executor:
+        resultados = list(executor.map(lambda n: ei.en_bloque(issue_falso, n), range(3)))
+    lineas = salida.getvalue().splitlines()
+    bloques = [lineas[i:i + 3] for i in range(0, len(lineas), 3)]
+    ok = comprobar("Resultados", resultados, [0, 1, 2])
+    ok &= comprobar("Sin intercalar", sorted(bloques),
+                    [[f"issue {n} paso {p}" for p in range(3)] for n in range(3)])
+    return ok
+
+
+# ==========================================
+# Referencias en títulos y cuerpos de PRs
+# ==========================================
+def verificar_referencias(ei):
+    print("\n📌 Palabras de cierre y referencias")
+    casos = [
+        ("Fixes #12", {12: "closes"}),
+        ("closes o/r#13", {13: "closes"}),
+        ("Resolved: https://github.com/o/r/issues/14", {14: "closes"}),
+        ("See #15", {15: "mentions"}),
+        ("see o/r#16 and https://github.com/o/r/issues/17", {16: "mentions", 17: "mentions"}),
+        ("fixes other/repo#18, see other/repo#19", {}),
+        ("https://github.com/other/repo/issues/20", {}),
+        ("https://github.com/o/r/pull/21", {}),
+        ("&#22; abc#23 ##24", {}),
+        ("FIXED #25, also #25", {25: "closes"}),
+    ]
+    ok = True
+    for texto, esperado in casos:
+        ok &= comprobar(repr(texto), ei.extraer_referencias(texto, REPO_OWNER, REPO_NAME), esperado)
+    return ok
+
+
+# ==========================================
+# Índice inverso con un listado /pulls paginado
+# ==========================================
+def pr_falso(numero, titulo, body, updated_at):
+    return {
+        "number": numero, "title": titulo, "body": body, "state": "closed", "merged_at": None,
+        "html_url": f"https://github.com/{REPO_OWNER}/{REPO_NAME}/pull/{numero}",
+        "url": f"{API_URL}/repos/{REPO_OWNER}/{REPO_NAME}/pulls/{numero}",
+        "updated_at": updated_at,
+    }
+
+
+def responder_pulls(prs, por_pagina=2, pagina_con_error=None):
+    """Listado /pulls ordenado por updated_at descendente, en páginas de 'por_pagina'."""
+    ordenados = sorted(prs, key=lambda pr: pr["updated_at"], reverse=True)
+
+    def responder(url, params, token):
+        pagina = params["page"]
+        if pagina == pagina_con_error:
+            return RespuestaFalsa(500)
+        return RespuestaFalsa(200, ordenados[(pagina - 1) * por_pagina:pagina * por_pagina])
+    return responder
+
+
+def construir(ei, responder):
+    sesion = SesionFalsa(responder)
+    ei.POOL = ei.PoolTokens(["falso"], session_factory=lambda: sesion)
+    with contextlib.redirect_stdout(io.StringIO()):
+        indice = ei.construir_indice_prs(REPO_OWNER, REPO_NAME)
+    return indice, len(sesion.peticiones)
+
+
+def verificar_indice(ei):
+    print("\n📌 Índice PR -> issues (incremental)")
+    ok = True
+    prs = [
+        pr_falso(10, "Fix crash", "Fixes #1", "2024-01-05T00:00:00Z"),
+        pr_falso(11, "Docs", "closes o/r#2, see #3", "2024-01-04T00:00:00Z"),
+        pr_falso(12, "Refactor", "fixes other/repo#4\nhttps://github.com/o/r/issues/5", "2024-01-03T00:00:00Z"),
+        pr_falso(13, "Cleanup", "Follow-up of #13. &#6; ##7", "2024-01-02T00:00:00Z"),
+    ]
+
+    # 1ª ejecución: índice vacío, recorre todas las páginas (2 + 2 + vacía)
+    indice, peticiones = construir(ei, responder_pulls(prs))
+    ok &= comprobar("1ª ejecución: issues", indice["issues"], {"1": [10], "2": [11], "3": [11], "5": [12]})
+    ok &= comprobar("1ª ejecución: cursor", indice["actualizado_hasta"], "2024-01-05T00:00:00Z")
+    ok &= comprobar("1ª ejecución: peticiones", peticiones, 3)
+    ok &= comprobar("PR que se referencia a sí mismo", indice["prs"]["13"]["issues"], {})
+
+    eventos = ei.eventos_desde_indice(indice, 1)
+    ok &= comprobar("eventos_desde_indice", [(e["event"], e["source"]["issue"]["number"],
+                                              e["source"]["issue"]["pull_request"]["url"]) for e in eventos],
+                    [("cross-referenced", 10, f"{API_URL}/repos/{REPO_OWNER}/{REPO_NAME}/pulls/10")])
+
+    # 2ª ejecución: PR 11 editado y PR 14 nuevo; se para al pasar el cursor (menos el margen)
+    prs[1] = pr_falso(11, "Docs", "Fixes #8", "2024-01-06T00:00:00Z")
+    prs.append(pr_falso(14, "Another fix", "fixes #1", "2024-01-07T00:00:00Z"))
+    indice, peticiones = construir(ei, responder_pulls(prs))
+    ok &= comprobar("2ª ejecución: issues", indice["issues"], {"1": [10, 14], "5": [12], "8": [11]})
+    ok &= comprobar("2ª ejecución: cursor", indice["actualizado_hasta"], "2024-01-07T00:00:00Z")
+    ok &= comprobar("2ª ejecución: peticiones", peticiones, 2)
+
+    # 3ª ejecución: un PR nuevo y error en la página 2 -> el cursor no avanza
+    prs.append(pr_falso(15, "Fix", "fixes #9", "2024-01-08T00:00:00Z"))
+    prs.append(pr_falso(16, "Fix", "fixes #9", "2024-01-09T00:00:00Z"))
+    indice, _ = construir(ei, responder_pulls(prs, pagina_con_error=2))
+    ok &= comprobar("Error a mitad: cursor conservado", indice["actualizado_hasta"], "2024-01-07T00:00:00Z")
+
+    # 4ª ejecución sin errores: recupera lo que quedó pendiente
+    indice, _ = construir(ei, responder_pulls(prs))
+    ok &= comprobar("Reintento: issues", indice["issues"]["9"], [15, 16])
+    ok &= comprobar("Reintento: cursor", indice["actualizado_hasta"], "2024-01-09T00:00:00Z")
+    return ok
+
+
+# ==========================================
+# Search API: tope de 1000 resultados por query
+# ==========================================
+def responder_busqueda(issues, max_peticiones=100):
+    """
+    /search/issues ordenado por created_at ascendente, 100 por página y como la API real
+    sólo hasta la página 10. Entiende 'created:>=FECHA'. Tras 'max_peticiones' devuelve
+    páginas vacías para que un bucle que no termina acabe (y falle la comprobación).
+    """
+    peticiones = []
+
+    def responder(url, params, token):
+        peticiones.append(params["q"])
+        if len(peticiones) > max_peticiones or params["page"] > 10:
+            return RespuestaFalsa(200, {"total_count": 0, "items": []})
+        desde = next((p[len("created:>="):] for p in params["q"].split() if p.startswith("created:>=")), "")
+        encontrados = [i for i in issues if i["created_at"] >= desde]
+        pagina = encontrados[(params["page"] - 1) * 100:params["page"] * 100]
+        return RespuestaFalsa(200, {"total_count": len(encontrados), "items": pagina})
+    return responder, peticiones
+
+
+def verificar_busqueda(ei):
+    print("\n📌 Modo candidatos: más de 1000 resultados")
+    # 2500 issues, de tres en tres con el mismo created_at (un grupo cae a caballo del resultado 1000)
+    issues = [{"number": n, "title": f"Issue {n}", "created_at": f"2024-01-01T00:{(n - 1) // 3 // 60:02d}:"
+               f"{(n - 1) // 3 % 60:02d}Z"} for n in range(1, 2501)]
+    issues.sort(key=lambda i: (i["created_at"], i["number"]))
+    responder, queries = responder_busqueda(issues)
+    sesion = SesionFalsa(responder)
+    ei.POOL = ei.PoolTokens(["falso"], session_factory=lambda: sesion)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        obtenidos = ei.get_issues_candidatos(REPO_OWNER, REPO_NAME, limite=None)
+    numeros = [i["number"] for i in obtenidos]
+    ok = comprobar("Sin duplicados", len(numeros), len(set(numeros)))
+    ok &= comprobar("Sin pérdidas", sorted(set(range(1, 2501)) - set(numeros)), [])
+    # 10 páginas + 10 desde el issue 1000 + 6 desde el 1999 (la última incompleta)
+    ok &= comprobar("Termina: peticiones", len(queries), 26)
+    ok &= comprobar("Relanza desde la última fecha",
+                    sorted({q.split()[-1] for q in queries if "created:" in q}),
+                    [f"created:>={issues[999]['created_at']}", f"created:>={issues[1998]['created_at']}"])
+    return ok
+
+
+# ==========================================
+# Campos pendientes: extracción parcial y completar_issues()
+# ==========================================
+def issue_crudo(numero, titulo):
+    return {"number": numero, "title": titulo, "body": f"cuerpo {numero}", "user": {"login": "alice"},
+            "created_at": "2024-01-01T00:00:00Z", "closed_at": "2024-01-02T00:00:00Z",
+            "state": "closed", "labels": []}
+
+
+def commit_api(sha, mensaje, archivos=None):
+    datos = {"sha": sha, "commit": {"message": mensaje,
+                                    "author": {"name": "bob", "date": "2024-01-01T12:00:00Z"}}}
+    if archivos is not None:
+        datos["files"] = [{"filename": a} for a in archivos]
+    return datos
+
+
+def responder_repo():
+    """
+    Issue 1 enlazado al PR 10 (commits c1 y c2), issue 2 cerrado por el commit directo d1
+    e issue 3 sin nada.
+    """
+    base = f"{API_URL}/repos/{REPO_OWNER}/{REPO_NAME}"
+    pr_url = f"{base}/pulls/10"
+    rutas = {
+        f"{base}/issues/1/timeline": [{"event": "cross-referenced", "source": {"type": "issue", "issue": {
+            "number": 10, "title": "Fix", "html_url": "https://github.com/o/r/pull/10", "state": "closed",
+            "pull_request": {"url": pr_url}}}}],
+        f"{base}/issues/2/timeline": [{"event": "closed", "commit_id": "d1"}],
+        f"{base}/issues/3/timeline": [],
+        f"{pr_url}/files": [{"filename": "src/app.py"}, {"filename": "docs/index.rst"}],
+        f"{pr_url}/commits": [commit_api("c1", "mensaje c1"), commit_api("c2", "mensaje c2")],
+        f"{base}/commits/d1": commit_api("d1", "mensaje d1", ["src/cli.py"]),
+        f"{base}/issues/1": {"body": "cuerpo 1"},
+        f"{base}/issues/2": {"body": "cuerpo 2"},
+        f"{base}/issues/3": {"body": "cuerpo 3"},
+    }
+
+    def responder(url, params, token):
+        if url in rutas:
+            return RespuestaFalsa(200, rutas[url])
+        return RespuestaFalsa(404, {})
+    return responder
+
+
+def rutas_pedidas(sesion):
+    """Rutas pedidas (sin el prefijo de la API), ordenadas, y vacía la lista."""
+    prefijo = f"{API_URL}/repos/{REPO_OWNER}/{REPO_NAME}"
+    rutas = sorted(url[len(prefijo):] for url, _, _ in sesion.peticiones)
+    sesion.peticiones.clear()
+    return rutas
+
+
+def verificar_pendientes(ei):
+    print("\n📌 Extracción parcial y completar_issues()")
+    ok = True
+    sesion = SesionFalsa(responder_repo())
+    ei.POOL = ei.PoolTokens(["falso"], session_factory=lambda: sesion)
+    with open(f"{REPO_NAME}_issues.json", "w", encoding="utf-8") as f:
+        json.dump([issue_crudo(1, "Crash"), issue_crudo(2, "Typo"), issue_crudo(3, "Pregunta")], f)
+
+    def cargar():
+        with open(f"{REPO_NAME}_issues_commits.json", "r", encoding="utf-8") as f:
+            return {i["id"]: i for i in json.load(f)}
+
+    # 1. Sólo lo que usa el log detallado: ni {pr}/commits, ni cuerpos, ni mensajes
+    with contextlib.redirect_stdout(io.StringIO()):
+        ei.get_issue_list(REPO_OWNER, REPO_NAME, salidas=["detallado"])
+    ok &= comprobar("detallado: endpoints", rutas_pedidas(sesion),
+                    ["/commits/d1", "/issues/1/timeline", "/issues/2/timeline", "/issues/3/timeline",
+                     "/pulls/10/files"])
+    issues = cargar()
+    ok &= comprobar("detallado: sin body", [n for n, i in issues.items() if "body" in i], [])
+    ok &= comprobar("detallado: sin message",
+                    [c["sha"] for i in issues.values() for c in i["related_commits"] if "message" in c], [])
+    ok &= comprobar("detallado: pending_fields", {n: i.get("pending_fields") for n, i in issues.items()},
+                    {n: ["pr_commits", "body", "commit_messages"] for n in issues})
+    ok &= comprobar("detallado: api_url en los PRs", [pr.get("api_url") for pr in issues[1]["related_prs"]],
+                    [f"{API_URL}/repos/{REPO_OWNER}/{REPO_NAME}/pulls/10"])
+
+    # 2. Lo que le falta al log simple: sólo los commits de los PRs, todavía sin mensajes
+    with contextlib.redirect_stdout(io.StringIO()):
+        ei.completar_issues(REPO_OWNER, REPO_NAME, salidas=["simple"])
+    ok &= comprobar("simple: endpoints", rutas_pedidas(sesion), ["/pulls/10/commits"])
+    issues = cargar()
+    ok &= comprobar("simple: commits del PR", [c["sha"] for c in issues[1]["related_commits"]], ["c1", "c2"])
+    ok &= comprobar("simple: sin message",
+                    [c["sha"] for i in issues.values() for c in i["related_commits"] if "message" in c], [])
+    ok &= comprobar("simple: pending_fields", {n: i.get("pending_fields") for n, i in issues.items()},
+                    {n: ["body", "commit_messages"] for n in issues})
+
+    # 3. Todo lo demás: cuerpos, mensajes de PR con una llamada por PR y /commits/{sha} sólo para d1
+    with contextlib.redirect_stdout(io.StringIO()):
+        ei.completar_issues(REPO_OWNER, REPO_NAME)
+    ok &= comprobar("completo: endpoints", rutas_pedidas(sesion),
+                    ["/commits/d1", "/issues/1", "/issues/2", "/issues/3", "/pulls/10/commits"])
+    issues = cargar()
+    ok &= comprobar("completo: body", {n: i.get("body") for n, i in issues.items()},
+                    {n: f"cuerpo {n}" for n in issues})
+    ok &= comprobar("completo: message", {c["sha"]: c.get("message") for i in issues.values()
+                                          for c in i["related_commits"]},
+                    {"c1": "mensaje c1", "c2": "mensaje c2", "d1": "mensaje d1"})
+    ok &= comprobar("completo: sin pending_fields ni api_url",
+                    [n for n, i in issues.items()
+                     if "pending_fields" in i or any("api_url" in pr for pr in i["related_prs"])], [])
+
+    # 4. Nada pendiente: ninguna petición
+    with contextlib.redirect_stdout(io.StringIO()):
+        ei.completar_issues(REPO_OWNER, REPO_NAME)
+    ok &= comprobar("sin pendientes: ninguna petición", rutas_pedidas(sesion), [])
+    return ok
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("VERIFICANDO EXTRACCIÓN CONTRA UNA API FALSA")
+    print("=" * 60)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        try:
+            ok = verificar_pool()
+            ei = cargar_extraer_issues()
+            ok &= verificar_salida(ei)
+            ok &= verificar_referencias(ei)
+            ok &= verificar_indice(ei)
+            ok &= verificar_busqueda(ei)
+            ok &= verificar_pendientes(ei)
+        finally:
+            os.chdir(directorio_original)
+
+    print("\n" + "=" * 60)
+    print("✅ TODO CORRECTO" if ok else "❌ HAY FALLOS")
+    print("=" * 60)
+    sys.exit(0 if ok else 1)